@@ -6,14 +6,20 @@ Compatible with Fabric Runtime 1.3 (Spark 3.5, Python 3.11)
 from typing import Optional
 from pyspark.sql import SparkSession
 import os
+import threading
+
+# Session handed out by get_or_create_spark_session (reset on stop)
+_SPARK: Optional[SparkSession] = None
+_SPARK_LOCK = threading.Lock()
 
 
 def create_spark_session(
     app_name: str = "DWH_Spark_Processing",
     master: Optional[str] = None,
-    executor_memory: str = "4g",
-    executor_cores: int = 2,
-    max_cores: int = 6
+    executor_memory: str = "8g",
+    executor_cores: int = 4,
+    max_cores: int = 8,
+    executor_memory_overhead: str = "1g"
 ) -> SparkSession:
     """
     Create Spark session configured for vanilla Spark cluster
@@ -24,6 +30,8 @@ def create_spark_session(
         executor_memory: Memory per executor
         executor_cores: Cores per executor
         max_cores: Maximum cores to use across cluster
+        executor_memory_overhead: Off-heap overhead per executor (counted
+            on top of executor_memory by the resource manager)
         
     Returns:
         SparkSession object
@@ -38,9 +46,27 @@ def create_spark_session(
         .config("spark.executor.memory", executor_memory) \
         .config("spark.executor.cores", str(executor_cores)) \
         .config("spark.cores.max", str(max_cores)) \
+        .config("spark.executor.memoryOverhead", executor_memory_overhead) \
+        .config("spark.task.cpus", "1") \
+        .config("spark.default.parallelism", str(max_cores * 3)) \
         .config("spark.sql.adaptive.enabled", "true") \
         .config("spark.sql.adaptive.coalescePartitions.enabled", "true") \
-        .config("spark.serializer", "org.apache.spark.serializer.KryoSerializer")
+        .config("spark.sql.adaptive.coalescePartitions.parallelismFirst", "false") \
+        .config("spark.sql.adaptive.advisoryPartitionSizeInBytes", "128m") \
+        .config("spark.sql.adaptive.coalescePartitions.initialPartitionNum", "1000") \
+        .config("spark.scheduler.mode", "FAIR") \
+        .config("spark.sql.adaptive.autoBroadcastJoinThreshold", "100m") \
+        .config("spark.sql.parquet.filterPushdown", "true") \
+        .config("spark.sql.hive.metastorePartitionPruning", "true") \
+        .config("spark.databricks.delta.optimizeMetadataQuery.enabled", "true") \
+        .config("spark.serializer", "org.apache.spark.serializer.KryoSerializer") \
+        .config("spark.kryo.unsafe", "true") \
+        .config("spark.kryo.referenceTracking", "false") \
+        .config("spark.kryo.registrationRequired", "false") \
+        .config("spark.kryo.classesToRegister",
+                "org.apache.spark.sql.catalyst.expressions.GenericRowWithSchema,"
+                "java.util.ArrayList") \
+        .config("spark.kryoserializer.buffer.max", "512m")
     
     return builder.getOrCreate()
 
@@ -49,14 +75,29 @@ def get_or_create_spark_session(app_name: str = "DWH_Spark_Processing") -> Spark
     """
     Get existing Spark session or create new one
     Singleton pattern for notebook environments
+
+    The session is cached at module level, so repeated calls skip the
+    builder/getOrCreate py4j round trips until the session is stopped.
     """
-    return SparkSession.builder.appName(app_name).getOrCreate()
+    global _SPARK
+
+    spark = _SPARK
+    if spark is None or spark.sparkContext._jsc is None:
+        with _SPARK_LOCK:
+            if _SPARK is None or _SPARK.sparkContext._jsc is None:
+                _SPARK = SparkSession.builder.appName(app_name).getOrCreate()
+            spark = _SPARK
+    return spark
 
 
 def stop_spark_session(spark: Optional[SparkSession] = None):
     """Stop the Spark session"""
+    global _SPARK
+
     if spark is None:
         spark = SparkSession.getActiveSession()
     
     if spark is not None:
-        spark.stop()
\ No newline at end of file
+        spark.stop()
+
+    _SPARK = None
\ No newline at end of file
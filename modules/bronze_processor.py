@@ -5,22 +5,117 @@ Provides core Bronze processing logic for loading tables from parquet to Delta.
 
 Architecture: Bronze History Pattern
 - Snapshot/Window tables: Overwrite entire table
+  (partitioned window tables: overwrite only the year/month partitions in the load)
 - Incremental tables: Append with _bronze_load_ts partition (for CDC)
 """
 
-from pyspark.sql import SparkSession, functions as F
-from pyspark.sql.functions import lit, input_file_name, col, year, month
+from pyspark.sql import DataFrame, DataFrameWriter, SparkSession, functions as F
+from pyspark.sql.functions import lit, col, year, month
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from uuid import uuid4
 import logging
+import re
+import threading
 
-from modules.path_utils import build_parquet_dir
-from modules.error_utils import is_missing_path_error, is_probably_corrupt_delta
-from modules.delta_utils import get_last_num_output_rows
+from modules.path_utils import build_parquet_dir, list_run_files
+from modules.error_utils import is_missing_path_error, is_probably_corrupt_delta, is_schema_mismatch_error
+from modules.delta_utils import get_last_num_output_rows, invalidate_table_cache, optimize_table
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on rows per Delta file for partitioned Bronze writes
+BRONZE_MAX_RECORDS_PER_FILE = 1_000_000
+
+# run_ts values that can be spliced into an OPTIMIZE partition predicate
+_RUN_TS_RE = re.compile(r"^[0-9A-Za-z]+$")
+
+
+@dataclass(slots=True)
+class BronzeResult:
+    """
+    Result of a single Bronze table load (one bronze_logs row).
+
+    Built once at the start of process_bronze_table; each exit only sets the
+    fields that differ and returns it via finish().
+    """
+    log_id: str
+    run_id: str
+    run_date: str
+    run_ts: str
+    source: str
+    table_name: str
+    load_mode: str
+    status: str = "RUNNING"
+    rows_processed: Optional[int] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    duration_seconds: int = 0
+    error_message: Optional[str] = None
+    parquet_path: Optional[str] = None
+    delta_table: Optional[str] = None
+
+    def finish(self, status: str, **overrides: Any) -> Dict[str, Any]:
+        """Stamp end_time/duration, apply overrides and return the result dict."""
+        self.status = status
+        for key, value in overrides.items():
+            setattr(self, key, value)
+        self.end_time = datetime.now(timezone.utc)
+        self.duration_seconds = int((self.end_time - self.start_time).total_seconds())
+        return asdict(self)
+
+
+def _bronze_partition_cols(
+    load_mode: str,
+    partitioning_config: Optional[Dict[str, Any]]
+) -> Tuple[str, ...]:
+    """Partition columns of the Bronze Delta table for a load mode/partitioning config."""
+    if load_mode == "incremental":
+        return ("_bronze_load_ts",)
+
+    if partitioning_config and partitioning_config.get("type") == "year_month":
+        return (
+            partitioning_config.get("year_col", "p_year"),
+            partitioning_config.get("month_col", "p_month"),
+        )
+
+    return ()
+
+
+@lru_cache(maxsize=None)
+def _bronze_writer_factory(
+    mode: str,
+    partition_cols: Tuple[str, ...],
+    overwrite_schema: bool,
+    dynamic_partition_overwrite: bool = False
+) -> Callable[[DataFrame], DataFrameWriter]:
+    """
+    Return a function that builds the Delta writer for a DataFrame.
+
+    Memoized per writer shape, so the branch logic runs once per distinct
+    (mode, partition columns, overwriteSchema) combination instead of per table.
+
+    With dynamic_partition_overwrite, an overwrite only replaces the partitions
+    present in the DataFrame (Delta does not allow this with overwriteSchema).
+    Partitioned writes cap files at BRONZE_MAX_RECORDS_PER_FILE rows.
+    """
+    def build(df: DataFrame) -> DataFrameWriter:
+        writer = df.write.format("delta").mode(mode)
+        if overwrite_schema:
+            writer = writer.option("overwriteSchema", "true")
+        if dynamic_partition_overwrite:
+            writer = writer.option("partitionOverwriteMode", "dynamic")
+        if partition_cols:
+            writer = writer \
+                .option("maxRecordsPerFile", BRONZE_MAX_RECORDS_PER_FILE) \
+                .partitionBy(*partition_cols)
+        return writer
+
+    return build
+
 
 def process_bronze_table(
     spark: SparkSession,
@@ -30,13 +125,15 @@ def process_bronze_table(
     run_ts: str,
     run_date: str,
     base_files: str = "greenhouse_sources",
-    debug: bool = False
+    debug: bool = False,
+    parquet_files: Optional[List[str]] = None
 ) -> Dict[str, Any]:
     """
     Load a single table's parquet files for a given run_ts into Bronze Delta table.
 
     Architecture:
     - Snapshot/Window: Overwrite entire table
+    - Window with year_month partitioning: Overwrite only the loaded partitions
     - Incremental: Append with _bronze_load_ts partition (for CDC)
 
     Args:
@@ -48,6 +145,9 @@ def process_bronze_table(
         run_date: Run date (for partitioning logs)
         base_files: Base directory for files (default: "greenhouse_sources")
         debug: Enable debug output
+        parquet_files: Optional pre-listed parquet files for this table (see
+            path_utils.list_run_files). Read directly instead of globbing the
+            table directory; an empty list means the table was not exported.
 
     Returns:
         Dict with processing results:
@@ -70,36 +170,30 @@ def process_bronze_table(
     # Initialize metrics
     log_id = f"{source_name}:{table_name}:{run_ts}:{uuid4().hex[:8]}"
     start_time = datetime.now(timezone.utc)
-    end_time = None
     status = "RUNNING"
     error_message = None
     rows_processed = None
 
+    result = BronzeResult(
+        log_id=log_id,
+        run_id=run_id,
+        run_date=run_date,
+        run_ts=run_ts,
+        source=source_name,
+        table_name=table_name,
+        load_mode=load_mode,
+        start_time=start_time,
+    )
+
     # Early exit for unsupported load modes
     if load_mode not in supported_modes:
-        end_time = datetime.now(timezone.utc)
-        duration = int((end_time - start_time).total_seconds())
-
         if debug:
             logger.info(f"[{table_name}] SKIPPED: unsupported load_mode '{load_mode}'")
 
-        return {
-            "log_id": log_id,
-            "run_id": run_id,
-            "run_date": run_date,
-            "run_ts": run_ts,
-            "source": source_name,
-            "table_name": table_name,
-            "load_mode": load_mode,
-            "status": "SKIPPED",
-            "rows_processed": None,
-            "start_time": start_time,
-            "end_time": end_time,
-            "duration_seconds": duration,
-            "error_message": f"Unsupported load_mode '{load_mode}'",
-            "parquet_path": None,
-            "delta_table": None,
-        }
+        return result.finish(
+            "SKIPPED",
+            error_message=f"Unsupported load_mode '{load_mode}'"
+        )
 
     # Build target table name
     target_table = table_def.get("delta_table") or table_name
@@ -114,6 +208,8 @@ def process_bronze_table(
     # Build parquet path
     parquet_dir = build_parquet_dir(base_files, source_name, run_ts, table_name, spark)
     parquet_glob = f"{parquet_dir}/*.parquet"
+    result.parquet_path = parquet_dir
+    result.delta_table = delta_table_full
 
     if debug:
         logger.info(f"[{table_name}] Starting ({load_mode})")
@@ -125,68 +221,47 @@ def process_bronze_table(
     # ========================================================================
 
     try:
-        df = spark.read.parquet(parquet_glob)
+        if parquet_files is None:
+            df = spark.read.parquet(parquet_glob)
+        elif parquet_files:
+            df = spark.read.parquet(*parquet_files)
+        else:
+            # Same outcome as a glob matching nothing
+            raise FileNotFoundError(f"Path does not exist: {parquet_glob}")
 
     except Exception as e:
         if is_missing_path_error(e):
             # No parquet files - table not exported in this run
-            end_time = datetime.now(timezone.utc)
-            duration = int((end_time - start_time).total_seconds())
-
             if debug:
                 logger.info(f"[{table_name}] SKIPPED: No parquet files in {parquet_dir}")
 
-            return {
-                "log_id": log_id,
-                "run_id": run_id,
-                "run_date": run_date,
-                "run_ts": run_ts,
-                "source": source_name,
-                "table_name": table_name,
-                "load_mode": load_mode,
-                "status": "SKIPPED",
-                "rows_processed": 0,
-                "start_time": start_time,
-                "end_time": end_time,
-                "duration_seconds": duration,
-                "error_message": f"No parquet files found in {parquet_dir}",
-                "parquet_path": parquet_dir,
-                "delta_table": delta_table_full,
-            }
+            return result.finish(
+                "SKIPPED",
+                rows_processed=0,
+                error_message=f"No parquet files found in {parquet_dir}"
+            )
         else:
             # Other read error
-            end_time = datetime.now(timezone.utc)
-            duration = int((end_time - start_time).total_seconds())
-
             if debug:
                 logger.info(f"[{table_name}] FAILED reading parquet: {str(e)[:200]}")
 
-            return {
-                "log_id": log_id,
-                "run_id": run_id,
-                "run_date": run_date,
-                "run_ts": run_ts,
-                "source": source_name,
-                "table_name": table_name,
-                "load_mode": load_mode,
-                "status": "FAILED",
-                "rows_processed": None,
-                "start_time": start_time,
-                "end_time": end_time,
-                "duration_seconds": duration,
-                "error_message": f"Read parquet failed: {str(e)[:500]}",
-                "parquet_path": parquet_dir,
-                "delta_table": delta_table_full,
-            }
+            return result.finish(
+                "FAILED",
+                error_message=f"Read parquet failed: {str(e)[:500]}"
+            )
 
     # ========================================================================
     # STEP 2: Add Metadata Columns
     # ========================================================================
 
-    # Add Bronze metadata columns
-    df_with_meta = df \
-        .withColumn("_bronze_load_ts", lit(run_ts)) \
-        .withColumn("_bronze_filename", input_file_name())
+    # Build all metadata columns in a single projection so the scan and the
+    # additions land in one Project node / codegen stage
+    # (_metadata.file_path is filled by the parquet scan itself, unlike the
+    # non-deterministic input_file_name() expression)
+    meta_cols = [
+        lit(run_ts).alias("_bronze_load_ts"),
+        col("_metadata.file_path").alias("_bronze_filename")
+    ]
 
     # For window tables with partitioning config, add partition columns
     partitioning_config = table_def.get("partitioning")
@@ -202,93 +277,72 @@ def process_bronze_table(
             window_col = window_config.get("column", "Boek_Datum")  # Default
 
             if window_col in df.columns:
-                df_with_meta = df_with_meta \
-                    .withColumn(year_col, year(col(window_col))) \
-                    .withColumn(month_col, month(col(window_col)))
+                meta_cols += [
+                    year(col(window_col)).alias(year_col),
+                    month(col(window_col)).alias(month_col)
+                ]
 
                 if debug:
                     logger.info(f"  Added partitioning: {year_col}, {month_col} from {window_col}")
 
+    df_with_meta = df.select("*", *meta_cols)
+
     # ========================================================================
     # STEP 3: Write to Delta
     # ========================================================================
 
+    # Writer shape depends only on (mode, partition columns, overwriteSchema)
+    partition_cols = _bronze_partition_cols(load_mode, partitioning_config)
+
+    # Cluster window rows by year/month so a partition is written by a few
+    # tasks instead of one small file per task that touches it. REBALANCE
+    # lets AQE split a skewed (large) month over several tasks, where a
+    # hash repartition would put each month in exactly one task.
+    # Incremental loads carry a single _bronze_load_ts value, so the scan
+    # split already yields one file per input split there.
+    if load_mode == "window" and partition_cols:
+        df_with_meta = df_with_meta.hint("rebalance", *partition_cols)
+
     try:
 
         # Determine write mode based on load_mode
         if load_mode == "incremental":
             # APPEND with partition by _bronze_load_ts (CDC history)
-            writer = df_with_meta.write \
-                .format("delta") \
-                .mode("append") \
-                .partitionBy("_bronze_load_ts")
+            writer = _bronze_writer_factory("append", partition_cols, False)(df_with_meta)
 
             if debug:
                 logger.info(f"  Mode: APPEND with partition by _bronze_load_ts (CDC history)")
+        elif load_mode == "window" and partition_cols:
+            # Partitioned window: only rewrite the year/month partitions in this load
+            writer = _bronze_writer_factory("overwrite", partition_cols, False, True)(df_with_meta)
 
-        elif load_mode in ("snapshot", "window"):
-            # OVERWRITE entire table
-
-            if partitioning_config:
-                # Partitioned overwrite
-                partition_type = partitioning_config.get("type")
-                if partition_type == "year_month":
-                    year_col = partitioning_config.get("year_col", "p_year")
-                    month_col = partitioning_config.get("month_col", "p_month")
-
-                    writer = df_with_meta.write \
-                        .format("delta") \
-                        .mode("overwrite") \
-                        .option("overwriteSchema", "true") \
-                        .partitionBy(year_col, month_col)
+            if debug:
+                logger.info(f"  Mode: DYNAMIC PARTITION OVERWRITE by {', '.join(partition_cols)}")
+        else:
+            # snapshot/window: OVERWRITE entire table
+            writer = _bronze_writer_factory("overwrite", partition_cols, True)(df_with_meta)
 
-                    if debug:
-                        logger.info(f"  Mode: OVERWRITE with partitioning by {year_col}, {month_col}")
+            if debug:
+                if partition_cols:
+                    logger.info(f"  Mode: OVERWRITE with partitioning by {', '.join(partition_cols)}")
                 else:
-                    # Unknown partition type, just overwrite
-                    writer = df_with_meta.write \
-                        .format("delta") \
-                        .mode("overwrite") \
-                        .option("overwriteSchema", "true")
-            else:
-                # No partitioning, simple overwrite
-                writer = df_with_meta.write \
-                    .format("delta") \
-                    .mode("overwrite") \
-                    .option("overwriteSchema", "true")
-
-                if debug:
                     logger.info(f"  Mode: OVERWRITE")
 
-        # Execute write
+        # Execute write (may create the table: refresh table_exists' listing)
         writer.saveAsTable(delta_table_full)
+        invalidate_table_cache(delta_table_full)
         rows_processed = get_last_num_output_rows(spark, delta_table_full)
 
         # Check for empty result
         if rows_processed == 0:
-            end_time = datetime.now(timezone.utc)
-            duration = int((end_time - start_time).total_seconds())
-
             if debug:
                 logger.info(f"[{table_name}] EMPTY: Parquet exists but contains 0 rows")
 
-            return {
-                "log_id": log_id,
-                "run_id": run_id,
-                "run_date": run_date,
-                "run_ts": run_ts,
-                "source": source_name,
-                "table_name": table_name,
-                "load_mode": load_mode,
-                "status": "EMPTY",
-                "rows_processed": 0,
-                "start_time": start_time,
-                "end_time": end_time,
-                "duration_seconds": duration,
-                "error_message": "Parquet exists but contains 0 rows",
-                "parquet_path": parquet_dir,
-                "delta_table": delta_table_full,
-            }
+            return result.finish(
+                "EMPTY",
+                rows_processed=0,
+                error_message="Parquet exists but contains 0 rows"
+            )
 
         # Success!
         status = "SUCCESS"
@@ -302,29 +356,13 @@ def process_bronze_table(
             try:
                 # Drop and recreate
                 spark.sql(f"DROP TABLE IF EXISTS {delta_table_full}")
+                invalidate_table_cache(delta_table_full)
 
-                # Recreate with appropriate partitioning
-                if load_mode == "incremental":
-                    writer = df_with_meta.write \
-                        .format("delta") \
-                        .mode("overwrite") \
-                        .option("overwriteSchema", "true") \
-                        .partitionBy("_bronze_load_ts")
-                elif partitioning_config and partitioning_config.get("type") == "year_month":
-                    year_col = partitioning_config.get("year_col", "p_year")
-                    month_col = partitioning_config.get("month_col", "p_month")
-                    writer = df_with_meta.write \
-                        .format("delta") \
-                        .mode("overwrite") \
-                        .option("overwriteSchema", "true") \
-                        .partitionBy(year_col, month_col)
-                else:
-                    writer = df_with_meta.write \
-                        .format("delta") \
-                        .mode("overwrite") \
-                        .option("overwriteSchema", "true")
+                # Recreate with the same partitioning, replacing data and schema
+                writer = _bronze_writer_factory("overwrite", partition_cols, True)(df_with_meta)
 
                 writer.saveAsTable(delta_table_full)
+                invalidate_table_cache(delta_table_full)
                 rows_processed = get_last_num_output_rows(spark, delta_table_full)
 
                 status = "SUCCESS"
@@ -339,6 +377,27 @@ def process_bronze_table(
 
                 if debug:
                     logger.info(f"[{table_name}] Recovery FAILED: {str(e2)[:200]}")
+        elif load_mode == "window" and partition_cols and is_schema_mismatch_error(e):
+            # Dynamic partition overwrite cannot change the schema: rewrite
+            # the whole table with overwriteSchema (the non-partitioned path)
+            logger.warning(
+                f"[{table_name}] Schema changed, falling back to full OVERWRITE: {str(e)[:200]}"
+            )
+
+            try:
+                writer = _bronze_writer_factory("overwrite", partition_cols, True)(df_with_meta)
+
+                writer.saveAsTable(delta_table_full)
+                invalidate_table_cache(delta_table_full)
+                rows_processed = get_last_num_output_rows(spark, delta_table_full)
+
+                status = "SUCCESS"
+            except Exception as e2:
+                status = "FAILED"
+                error_message = f"Write failed after schema change: {str(e2)[:500]}"
+
+                if debug:
+                    logger.info(f"[{table_name}] Schema fallback FAILED: {str(e2)[:200]}")
         else:
             status = "FAILED"
             error_message = f"Write failed: {str(e)[:500]}"
@@ -347,29 +406,146 @@ def process_bronze_table(
                 logger.info(f"[{table_name}] FAILED: {str(e)[:200]}")
 
     # ========================================================================
-    # STEP 4: Return Results
+    # STEP 4: Z-ORDER Incremental History (optional)
     # ========================================================================
 
-    end_time = datetime.now(timezone.utc)
-    duration = int((end_time - start_time).total_seconds())
+    if status == "SUCCESS" and load_mode == "incremental" and table_def.get("zorder_by"):
+        _maybe_zorder_bronze_table(spark, table_def, delta_table_full, run_ts, debug)
+
+    # ========================================================================
+    # STEP 5: Return Results
+    # ========================================================================
+
+    final = result.finish(status, rows_processed=rows_processed, error_message=error_message)
 
     if debug:
-        logger.info(f"[{table_name}] {status} in {duration}s ({rows_processed:,} rows)")
-
-    return {
-        "log_id": log_id,
-        "run_id": run_id,
-        "run_date": run_date,
-        "run_ts": run_ts,
-        "source": source_name,
-        "table_name": table_name,
-        "load_mode": load_mode,
-        "status": status,
-        "rows_processed": rows_processed,
-        "start_time": start_time,
-        "end_time": end_time,
-        "duration_seconds": duration,
-        "error_message": error_message,
-        "parquet_path": parquet_dir,
-        "delta_table": delta_table_full,
-    }
+        logger.info(f"[{table_name}] {status} in {final['duration_seconds']}s ({rows_processed:,} rows)")
+
+    return final
+
+
+def _maybe_zorder_bronze_table(
+    spark: SparkSession,
+    table_def: Dict[str, Any],
+    delta_table_full: str,
+    run_ts: str,
+    debug: bool = False
+) -> None:
+    """
+    Z-ORDER the partition of this load in an incremental Bronze table.
+
+    Appended history files are unordered on the business keys, so Delta's
+    min/max file statistics cannot skip files for key-predicated CDC reads.
+    Only the _bronze_load_ts partition just written is optimized, so the cost
+    stays proportional to one load instead of growing with the table's
+    history. Failures are logged and never fail the load itself.
+
+    Table definition keys:
+        zorder_by: List of columns (typically the business keys)
+    """
+    zorder_cols = table_def["zorder_by"]
+
+    if not _RUN_TS_RE.match(run_ts):
+        logger.warning(f"Z-ORDER of {delta_table_full} skipped: unexpected run_ts '{run_ts}'")
+        return
+
+    try:
+        optimize_table(spark, delta_table_full, zorder_cols, where=f"_bronze_load_ts = '{run_ts}'")
+
+        if debug:
+            logger.info(f"  Z-ORDERed {delta_table_full} partition {run_ts} by {zorder_cols}")
+    except Exception as e:
+        logger.warning(f"Z-ORDER of {delta_table_full} failed (load kept): {str(e)[:200]}")
+
+
+def process_bronze_tables_batch(
+    spark: SparkSession,
+    table_defs: List[Dict[str, Any]],
+    source_name: str,
+    run_id: str,
+    run_ts: str,
+    run_date: str,
+    base_files: str = "greenhouse_sources",
+    max_workers: int = 8,
+    debug: bool = False,
+    list_files: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Load many Bronze tables concurrently on one shared SparkSession.
+
+    Each worker thread submits its jobs to its own fair-scheduler pool so the
+    small per-table jobs interleave instead of queueing behind each other
+    (effective when the session runs with ``spark.scheduler.mode=FAIR``).
+
+    Args:
+        spark: Active SparkSession
+        table_defs: Table definitions from DAG
+        source_name: Source system name (e.g., "vizier")
+        run_id: Unique run identifier
+        run_ts: Run timestamp (e.g., "20251105T142752505")
+        run_date: Run date (for partitioning logs)
+        base_files: Base directory for files (default: "greenhouse_sources")
+        max_workers: Number of concurrent table loads (default: 8)
+        debug: Enable debug output
+        list_files: List the run's parquet files once up front (fresh, not
+            from the cache) and hand each table its file list, instead of a glob
+            LIST per table (default: True). A missing or empty run directory
+            falls back to the per-table glob.
+
+    Returns:
+        List of result dicts (see process_bronze_table), in table_defs order.
+        Unhandled worker exceptions are returned as FAILED results.
+
+    Example:
+        >>> results = process_bronze_tables_batch(
+        ...     spark, tables_to_process, "vizier", run_id, run_ts, run_date,
+        ...     max_workers=10
+        ... )
+        >>> failed = [r for r in results if r["status"] == "FAILED"]
+    """
+    if not table_defs:
+        return []
+
+    run_files = None
+    if list_files:
+        try:
+            run_files = list_run_files(spark, base_files, source_name, run_ts, refresh=True) or None
+        except Exception as e:
+            logger.warning(f"Listing run files failed, falling back to per-table glob: {str(e)[:200]}")
+
+    def _process(table_def: Dict[str, Any]) -> Dict[str, Any]:
+        sc = spark.sparkContext
+        sc.setLocalProperty("spark.scheduler.pool", threading.current_thread().name)
+        try:
+            return process_bronze_table(
+                spark=spark,
+                table_def=table_def,
+                source_name=source_name,
+                run_id=run_id,
+                run_ts=run_ts,
+                run_date=run_date,
+                base_files=base_files,
+                debug=debug,
+                parquet_files=run_files.get(table_def.get("name"), []) if run_files is not None else None
+            )
+        except Exception as e:
+            return BronzeResult(
+                log_id=f"{source_name}:{table_def.get('name')}:{run_ts}:error",
+                run_id=run_id,
+                run_date=run_date,
+                run_ts=run_ts,
+                source=source_name,
+                table_name=table_def.get("name"),
+                load_mode=table_def.get("load_mode"),
+                start_time=datetime.now(timezone.utc),
+            ).finish("FAILED", error_message=f"Unhandled exception: {str(e)[:500]}")
+        finally:
+            sc.setLocalProperty("spark.scheduler.pool", None)
+
+    workers = max(1, min(max_workers, len(table_defs)))
+
+    if debug:
+        logger.info(f"Processing {len(table_defs)} Bronze tables with {workers} workers")
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bronze_pool") as executor:
+        return list(executor.map(_process, table_defs))
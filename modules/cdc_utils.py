@@ -5,8 +5,8 @@ Provides helper functions for CDC operations between Bronze and Silver layers.
 """
 
 from typing import List, Optional
+from pyspark import StorageLevel
 from pyspark.sql import DataFrame, SparkSession, functions as F
-from pyspark.sql.window import Window
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,7 +16,9 @@ def reconstruct_bronze_current_state(
     spark: SparkSession,
     bronze_table: str,
     business_keys: List[str],
-    run_ts: Optional[str] = None
+    run_ts: Optional[str] = None,
+    cache: bool = False,
+    required_columns: Optional[List[str]] = None
 ) -> DataFrame:
     """
     Reconstruct the current state from Bronze history.
@@ -29,6 +31,11 @@ def reconstruct_bronze_current_state(
         bronze_table: Full Bronze table name (e.g., "bronze.Dim_Relatie")
         business_keys: List of business key columns
         run_ts: Optional run_ts to filter up to (for point-in-time reconstruction)
+        cache: Persist the result (serialized, spilling to disk) and materialize
+            it, so several consumers share one aggregation. Caller unpersists.
+        required_columns: Optional columns to keep (business keys and
+            _bronze_load_ts are always kept). Projected right after the scan so
+            parquet only reads and shuffles those column chunks.
 
     Returns:
         DataFrame with current state (one row per business key)
@@ -48,21 +55,46 @@ def reconstruct_bronze_current_state(
         ...     ["Rel_Id"],
         ...     run_ts="20251115T060000"
         ... )
+        >>>
+        >>> # Only keys + compared columns (narrow shuffle for wide tables)
+        >>> keys_only = reconstruct_bronze_current_state(
+        ...     spark, "bronze.Dim_Relatie", ["Rel_Id"], required_columns=["Naam"]
+        ... )
+        >>>
+        >>> # Reuse one reconstruction for several CDC steps
+        >>> current = reconstruct_bronze_current_state(
+        ...     spark, "bronze.Dim_Relatie", ["Rel_Id"], cache=True
+        ... )
+        >>> deleted = detect_deletes(spark, current, "silver.Dim_Relatie", ["Rel_Id"])
+        >>> changes = compare_row_hashes(add_row_hash(current), silver_df, ["Rel_Id"])
+        >>> current.unpersist()
     """
     bronze_df = spark.table(bronze_table)
 
-    # Filter by run_ts if provided (point-in-time reconstruction)
+    # Column projection before the aggregate (keeps key/ordering columns)
+    if required_columns:
+        projected = list(dict.fromkeys([*business_keys, *required_columns, "_bronze_load_ts"]))
+        bronze_df = bronze_df.select(*projected)
+
+    # Filter by run_ts if provided (point-in-time reconstruction).
+    # _bronze_load_ts is the Bronze partition column, so Delta prunes whole
+    # partitions before any files are read.
     if run_ts:
         bronze_df = bronze_df.where(F.col("_bronze_load_ts") <= run_ts)
 
-    # Window: partition by business keys, order by _bronze_load_ts DESC
-    window = Window.partitionBy(*business_keys).orderBy(F.col("_bronze_load_ts").desc())
-
-    # Add row number and filter to rn=1 (latest per key)
+    # Latest row per key via max_by: runs as a partial + final hash aggregate,
+    # so no per-partition sort like Window + row_number()
+    all_cols = bronze_df.columns
     current_state = bronze_df \
-        .withColumn("_rn", F.row_number().over(window)) \
-        .where(F.col("_rn") == 1) \
-        .drop("_rn")
+        .groupBy(*business_keys) \
+        .agg(F.max_by(F.struct(*all_cols), "_bronze_load_ts").alias("_latest")) \
+        .select("_latest.*")
+
+    if cache:
+        # PySpark's MEMORY_AND_DISK is stored serialized (the JVM's
+        # MEMORY_AND_DISK_SER), so cached blocks go through the Kryo serializer
+        current_state = current_state.persist(StorageLevel.MEMORY_AND_DISK)
+        current_state.count()
 
     return current_state
 
@@ -90,17 +122,16 @@ def get_business_columns(df: DataFrame) -> List[str]:
     """
     metadata_prefixes = ("_bronze_", "_silver_", "_metadata_")
 
-    return [
-        c for c in df.columns
-        if not any(c.startswith(prefix) for prefix in metadata_prefixes)
-    ]
+    # str.startswith accepts the whole prefix tuple in one call
+    return [c for c in df.columns if not c.startswith(metadata_prefixes)]
 
 
 def detect_deletes(
     spark: SparkSession,
     bronze_current: DataFrame,
     silver_table: str,
-    business_keys: List[str]
+    business_keys: List[str],
+    broadcast_bronze: bool = False
 ) -> DataFrame:
     """
     Detect deleted records (keys in Silver but not in Bronze).
@@ -112,6 +143,9 @@ def detect_deletes(
         bronze_current: Current Bronze state DataFrame
         silver_table: Full Silver table name
         business_keys: List of business key columns
+        broadcast_bronze: Broadcast the Bronze key side of the join. Use when
+            the Bronze state is known to be small; otherwise AQE decides at
+            runtime based on spark.sql.adaptive.autoBroadcastJoinThreshold.
 
     Returns:
         DataFrame with deleted keys (business keys only)
@@ -131,9 +165,13 @@ def detect_deletes(
     # Get active keys from Silver (not already deleted)
     silver_active = spark.table(silver_table).where("is_deleted = false")
 
+    bronze_keys = bronze_current.select(*business_keys)
+    if broadcast_bronze:
+        bronze_keys = F.broadcast(bronze_keys)
+
     # Find keys in Silver but not in Bronze (LEFT ANTI join)
     deleted_keys = silver_active.select(*business_keys).join(
-        bronze_current.select(*business_keys),
+        bronze_keys,
         business_keys,
         "left_anti"
     )
@@ -141,53 +179,132 @@ def detect_deletes(
     return deleted_keys
 
 
+def _cdc_operation_predicates() -> dict:
+    """
+    Predicate per CDC operation over a compare_row_hashes join.
+
+    Presence comes from the in_bronze/in_silver key-side flags rather than
+    from hash nullness, so a row with a NULL hash is never counted as both an
+    insert and a delete. Hashes are compared null-safe.
+    """
+    in_bronze = F.col("in_bronze").isNotNull()
+    in_silver = F.col("in_silver").isNotNull()
+    same_hash = F.col("bronze_hash").eqNullSafe(F.col("silver_hash"))
+
+    return {
+        "inserts": in_bronze & ~in_silver,
+        "updates": in_bronze & in_silver & ~same_hash,
+        "deletes": ~in_bronze & in_silver,
+        "unchanged": in_bronze & in_silver & same_hash,
+    }
+
+
 def compare_row_hashes(
     bronze_df: DataFrame,
     silver_df: DataFrame,
     business_keys: List[str],
-    hash_column: str = "row_hash"
+    hash_column: str = "row_hash",
+    broadcast_silver: bool = False,
+    cache: bool = False
 ) -> dict:
     """
     Compare row hashes between Bronze and Silver to identify changes.
 
+    By default all operations are derived from ONE full outer join on the
+    business keys (a single shuffle). With cache, the joined result is
+    persisted so the per-operation DataFrames can be consumed separately
+    without re-running the join. With broadcast_silver, the Silver side is
+    broadcast into left-anti/inner joins instead, which avoids shuffling
+    Bronze entirely.
+
+    Args:
+        bronze_df: Bronze DataFrame with hash column
+        silver_df: Silver DataFrame with hash column
+        business_keys: List of business key columns
+        hash_column: Name of the hash column (default: "row_hash")
+        broadcast_silver: Broadcast the Silver side of the joins, e.g. when
+            comparing a small Silver subset against a large Bronze batch
+        cache: Persist the joined result (serialized, spilling to disk) and
+            materialize it, so several consumers share one join. Caller
+            unpersists result["joined"]. Ignored with broadcast_silver.
+
     Returns:
         Dict with DataFrames for each CDC operation:
         - inserts: Keys in Bronze but not Silver
         - updates: Keys in both with different hash
         - unchanged: Keys in both with same hash
         - deletes: Keys in Silver but not Bronze (requires separate call to detect_deletes)
+        - joined: Full outer join (business keys, bronze_hash, silver_hash,
+          in_bronze, in_silver), or None with broadcast_silver; persisted
+          only with cache=True
 
     Example:
         >>> result = compare_row_hashes(
         ...     bronze_with_hash,
         ...     silver_with_hash,
-        ...     ["Rel_Id"]
+        ...     ["Rel_Id"],
+        ...     cache=True
         ... )
         >>> print(f"Inserts: {result['inserts'].count()}")
         >>> print(f"Updates: {result['updates'].count()}")
         >>> print(f"Unchanged: {result['unchanged'].count()}")
+        >>> result["joined"].unpersist()
     """
-    # INSERTS: Keys in Bronze but not Silver
-    inserts = bronze_df.select(*business_keys, hash_column).join(
-        silver_df.select(*business_keys),
-        business_keys,
-        "left_anti"
+    bronze_keys_hash = bronze_df.select(
+        *business_keys, F.col(hash_column).alias("bronze_hash"), F.lit(True).alias("in_bronze")
+    )
+    silver_keys_hash = silver_df.select(
+        *business_keys, F.col(hash_column).alias("silver_hash"), F.lit(True).alias("in_silver")
     )
+    predicates = _cdc_operation_predicates()
+
+    if broadcast_silver:
+        # Broadcast joins do not support FULL OUTER, so keep separate
+        # (shuffle-free) joins against the broadcast Silver side
+        silver_keys_hash = F.broadcast(silver_keys_hash)
+
+        # INSERTS: Keys in Bronze but not Silver
+        inserts = bronze_df.select(*business_keys, hash_column).join(
+            silver_keys_hash.select(*business_keys),
+            business_keys,
+            "left_anti"
+        )
+
+        compared = bronze_keys_hash.join(silver_keys_hash, business_keys, "inner")
+        updates = compared.where(predicates["updates"]).select(*business_keys)
+        unchanged = compared.where(predicates["unchanged"]).select(*business_keys)
+
+        return {
+            "inserts": inserts,
+            "updates": updates,
+            "unchanged": unchanged,
+            "joined": None,
+        }
+
+    # Single FULL OUTER JOIN, classified afterwards
+    joined = bronze_keys_hash.join(silver_keys_hash, business_keys, "full_outer")
+
+    if cache:
+        # Same storage level as reconstruct_bronze_current_state(cache=True)
+        joined = joined.persist(StorageLevel.MEMORY_AND_DISK)
+        joined.count()
 
-    # UPDATES: Keys in both with different hash
-    bronze_keys_hash = bronze_df.select(*business_keys, F.col(hash_column).alias("bronze_hash"))
-    silver_keys_hash = silver_df.select(*business_keys, F.col(hash_column).alias("silver_hash"))
+    # INSERTS: Keys in Bronze but not Silver
+    inserts = joined \
+        .where(predicates["inserts"]) \
+        .select(*business_keys, F.col("bronze_hash").alias(hash_column))
 
-    compared = bronze_keys_hash.join(silver_keys_hash, business_keys, "inner")
-    updates = compared.where("bronze_hash != silver_hash").select(*business_keys)
+    # UPDATES: Keys in both with different hash
+    updates = joined.where(predicates["updates"]).select(*business_keys)
 
     # UNCHANGED: Keys in both with same hash
-    unchanged = compared.where("bronze_hash = silver_hash").select(*business_keys)
+    unchanged = joined.where(predicates["unchanged"]).select(*business_keys)
 
     return {
         "inserts": inserts,
         "updates": updates,
         "unchanged": unchanged,
+        "joined": joined,
     }
 
 
@@ -233,3 +350,37 @@ def get_cdc_statistics(
         "unchanged": unchanged_count,
         "change_rate_pct": change_rate_pct,
     }
+
+
+def get_cdc_statistics_from_df(joined: DataFrame) -> dict:
+    """
+    Calculate CDC statistics from a joined Bronze/Silver hash comparison in one pass.
+
+    Computes all four counts with a single aggregation instead of one
+    ``count()`` job per CDC operation, using the same predicates as
+    compare_row_hashes. Keys only present in Silver are counted as deletes,
+    so build ``joined`` from active (``is_deleted = false``) Silver rows.
+
+    Args:
+        joined: Full outer join with hash and presence columns, as returned
+            in ``compare_row_hashes(...)["joined"]``
+
+    Returns:
+        Dict with statistics (see get_cdc_statistics)
+
+    Example:
+        >>> result = compare_row_hashes(bronze_with_hash, silver_active, ["Rel_Id"])
+        >>> stats = get_cdc_statistics_from_df(result["joined"])
+        >>> print(f"Change rate: {stats['change_rate_pct']:.1f}%")
+    """
+    counts = joined.agg(*[
+        F.sum(F.when(predicate, 1).otherwise(0)).alias(operation)
+        for operation, predicate in _cdc_operation_predicates().items()
+    ]).first()
+
+    return get_cdc_statistics(
+        inserts_count=counts["inserts"] or 0,
+        updates_count=counts["updates"] or 0,
+        deletes_count=counts["deletes"] or 0,
+        unchanged_count=counts["unchanged"] or 0,
+    )
@@ -9,12 +9,74 @@ Provides configuration management for the data pipeline:
 """
 
 import json
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
 import os
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Parse config JSON with orjson when installed (C parser on bytes),
+# otherwise the stdlib parser, which also accepts bytes
+try:
+    import orjson  # type: ignore
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Values of a table's "enabled" field that count as enabled
+_TRUTHY: frozenset = frozenset({True, 1, "1", "true", "True"})
+
+# Load modes understood by the Bronze/Silver processors
+_VALID_LOAD_MODES: frozenset = frozenset({"snapshot", "incremental", "window"})
+
+
+def _load_json(path: str) -> Any:
+    """
+    Parse a JSON file read as bytes with orjson/json (no text-mode decode).
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+    """
+    return _json_loads(Path(path).read_bytes())
+
+
+def clear_config_cache() -> None:
+    """Drop the cached watermarks source index."""
+    _WATERMARK_INDEX.clear()
+
+
+# Watermarks source index: abspath -> (st_mtime_ns, st_size, {source: tables})
+_WATERMARK_INDEX: Dict[str, Tuple[int, int, Dict[str, Dict[str, Any]]]] = {}
+
+
+def _load_watermark_index(watermarks_path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Return the {source_name: tables} index of a watermarks file.
+
+    Built once per file version, keyed on (mtime_ns, size). The first
+    entry wins for duplicate source names, matching a linear scan. The
+    returned mapping is shared: treat it as read-only.
+    """
+    abspath = os.path.abspath(watermarks_path)
+    try:
+        stat = os.stat(abspath)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Watermarks file not found: {watermarks_path}") from None
+
+    cached = _WATERMARK_INDEX.get(abspath)
+    if cached is None or cached[:2] != (stat.st_mtime_ns, stat.st_size):
+        index: Dict[str, Dict[str, Any]] = {}
+        for src in load_watermarks(watermarks_path).get("source", []):
+            index.setdefault(src.get("name"), src.get("tables", {}))
+        cached = (stat.st_mtime_ns, stat.st_size, index)
+        _WATERMARK_INDEX[abspath] = cached
+
+    return cached[2]
+
 
 def load_dag(dag_path: str, base_path: Optional[str] = None) -> Dict[str, Any]:
     """
@@ -41,15 +103,22 @@ def load_dag(dag_path: str, base_path: Optional[str] = None) -> Dict[str, Any]:
         if not dag_path.startswith(base_path):
             dag_path = f"{base_path}/{dag_path}"
 
-    if not os.path.exists(dag_path):
-        raise FileNotFoundError(f"DAG file not found: {dag_path}")
-
-    with open(dag_path, 'r') as f:
-        dag = json.load(f)
+    try:
+        dag = _load_json(dag_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"DAG file not found: {dag_path}") from None
 
     # Validate required fields
     validate_dag(dag)
 
+    # Resolve default Bronze/Silver table names once per table
+    for table in dag["tables"]:
+        table["_bronze_fullname"] = build_bronze_table_name(table)
+        table["_silver_fullname"] = build_silver_table_name(table)
+
+    # Precompute table lookups once per loaded DAG
+    dag["__index__"] = _build_dag_index(dag)
+
     return dag
 
 
@@ -79,8 +148,6 @@ def validate_dag(dag: Dict[str, Any]) -> None:
         raise ValueError("DAG has no tables defined")
 
     # Validate each table
-    valid_load_modes = {"snapshot", "incremental", "window"}
-
     for idx, table in enumerate(dag["tables"]):
         if "name" not in table:
             raise ValueError(f"Table at index {idx} missing 'name' field")
@@ -88,8 +155,64 @@ def validate_dag(dag: Dict[str, Any]) -> None:
         # Validate load_mode if present
         if "load_mode" in table:
             load_mode = table["load_mode"].lower()
-            if load_mode not in valid_load_modes:
-                logger.warning(f"Table '{table['name']}' has unsupported load_mode: {load_mode}")
+            if load_mode not in _VALID_LOAD_MODES:
+                logger.warning("Table '%s' has unsupported load_mode: %s", table['name'], load_mode)
+
+
+def _build_dag_index(dag: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build table lookups for a DAG in a single pass over dag["tables"].
+
+    Returns:
+        Dict with:
+        - enabled_tables: enabled table definitions (DAG order)
+        - by_name: table name -> (DAG position, table definition, enabled)
+        - load_mode_counts: load_mode as written -> count of enabled tables
+        - tables_id / tables_len: identity of the tables list it was built from
+    """
+    tables = dag["tables"]
+    enabled_tables = []
+    by_name: Dict[str, Tuple[int, Dict[str, Any], bool]] = {}
+    load_mode_counts: Counter = Counter()
+
+    for position, table in enumerate(tables):
+        # Default to enabled if field missing
+        # Handle various true values (True, 1, "1", "true")
+        enabled = table.get("enabled", True) in _TRUTHY
+        by_name.setdefault(table["name"], (position, table, enabled))
+
+        if not enabled:
+            continue
+
+        enabled_tables.append(table)
+        load_mode_counts[table.get("load_mode", "snapshot")] += 1
+
+    return {
+        "enabled_tables": enabled_tables,
+        "by_name": by_name,
+        "load_mode_counts": load_mode_counts,
+        "tables_id": id(tables),
+        "tables_len": len(tables),
+    }
+
+
+def _dag_index(dag: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return the DAG's table index, (re)building it when missing or stale.
+
+    DAGs that did not come from load_dag, or whose "tables" list was
+    replaced or resized, get a fresh index. In-place edits of a table
+    definition (e.g. flipping "enabled") are NOT detected: drop the index
+    with ``dag.pop("__index__", None)`` after such edits.
+    """
+    index = dag.get("__index__")
+    tables = dag["tables"]
+
+    if index is None or index["tables_id"] != id(tables) or index["tables_len"] != len(tables):
+        index = _build_dag_index(dag)
+        dag["__index__"] = index
+
+    return index
 
 
 def get_enabled_tables(dag: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -102,17 +225,7 @@ def get_enabled_tables(dag: Dict[str, Any]) -> List[Dict[str, Any]]:
     Returns:
         List of table definitions
     """
-    enabled = []
-
-    for table in dag["tables"]:
-        # Default to enabled if field missing
-        enabled_flag = table.get("enabled", True)
-
-        # Handle various true values (True, 1, "1", "true")
-        if enabled_flag in (True, 1, "1", "true", "True"):
-            enabled.append(table)
-
-    return enabled
+    return list(_dag_index(dag)["enabled_tables"])
 
 
 def filter_retry_tables(
@@ -135,11 +248,11 @@ def filter_retry_tables(
     retry_set = set(retry_tables)
     filtered = [t for t in tables if t["name"] in retry_set]
 
-    # Warn about missing tables
-    found_names = {t["name"] for t in filtered}
-    missing = retry_set - found_names
-    if missing:
-        logger.warning(f"Retry tables not found in DAG: {sorted(missing)}")
+    # Warn about missing tables (diff only computed when it would be logged)
+    if len(filtered) < len(retry_set) and logger.isEnabledFor(logging.WARNING):
+        missing = retry_set.difference(t["name"] for t in filtered)
+        if missing:
+            logger.warning("Retry tables not found in DAG: %s", sorted(missing))
 
     return filtered
 
@@ -183,17 +296,27 @@ def get_tables_to_process(
     Returns:
         List of table definitions to process
     """
-    tables = dag["tables"]
+    # Retry list: look the names up in the DAG index (O(retry) instead of a
+    # scan of all tables), returned in DAG order
+    if retry_tables:
+        by_name = _dag_index(dag)["by_name"]
+        retry_set = set(retry_tables)
+        hits = [
+            by_name[name] for name in retry_set
+            if name in by_name and (by_name[name][2] or not only_enabled)
+        ]
+
+        if len(hits) < len(retry_set):
+            missing = retry_set.difference(table["name"] for _, table, _ in hits)
+            logger.warning("Retry tables not found in DAG: %s", sorted(missing))
+
+        return [table for _, table, _ in sorted(hits, key=lambda hit: hit[0])]
 
     # Filter by enabled status
     if only_enabled:
-        tables = get_enabled_tables(dag)
+        return get_enabled_tables(dag)
 
-    # Filter by retry list if provided
-    if retry_tables:
-        tables = filter_retry_tables(tables, retry_tables)
-
-    return tables
+    return dag["tables"]
 
 
 def load_watermarks(watermarks_path: str) -> Dict[str, Any]:
@@ -208,11 +331,10 @@ def load_watermarks(watermarks_path: str) -> Dict[str, Any]:
     Returns:
         Dict with watermarks configuration
     """
-    if not os.path.exists(watermarks_path):
-        raise FileNotFoundError(f"Watermarks file not found: {watermarks_path}")
-
-    with open(watermarks_path, 'r') as f:
-        watermarks = json.load(f)
+    try:
+        watermarks = _load_json(watermarks_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Watermarks file not found: {watermarks_path}") from None
 
     return watermarks
 
@@ -231,16 +353,11 @@ def get_source_watermarks(
     Returns:
         Dict with table watermarks, or None if source not found
     """
-    watermarks = load_watermarks(watermarks_path)
-
     # Watermarks structure: {"source": [{"name": "vizier", "tables": {...}}]}
-    sources = watermarks.get("source", [])
-
-    for src in sources:
-        if src.get("name") == source:
-            return src.get("tables", {})
+    tables = _load_watermark_index(watermarks_path).get(source)
 
-    return None
+    # Copy so callers cannot modify the cached index
+    return dict(tables) if tables is not None else None
 
 
 def get_table_watermark(
@@ -259,7 +376,7 @@ def get_table_watermark(
     Returns:
         Watermark value (string, int, or None)
     """
-    source_wm = get_source_watermarks(watermarks_path, source)
+    source_wm = _load_watermark_index(watermarks_path).get(source)
 
     if source_wm is None:
         return None
@@ -280,17 +397,28 @@ def build_bronze_table_name(
 
     Returns:
         Full table name (schema.table)
+
+    Note:
+        Table definitions from load_dag carry the name resolved with the
+        default schema in "_bronze_fullname", which is returned directly.
     """
+    if default_schema == "bronze" and "_bronze_fullname" in table_def:
+        return table_def["_bronze_fullname"]
+
     table_name = table_def.get("name")
-    delta_table = table_def.get("delta_table", table_name)
+    return _bronze_table_name(
+        table_def.get("delta_table", table_name),
+        table_def.get("delta_schema", default_schema)
+    )
+
 
+@lru_cache(maxsize=4096)
+def _bronze_table_name(delta_table: str, schema: str) -> str:
+    """Memoized core of build_bronze_table_name."""
     # Check if delta_table already has schema
     if "." in delta_table:
         return delta_table
 
-    # Get schema from table_def or use default
-    schema = table_def.get("delta_schema", default_schema)
-
     return f"{schema}.{delta_table}"
 
 
@@ -307,14 +435,33 @@ def build_silver_table_name(
 
     Returns:
         Full table name (schema.table)
+
+    Note:
+        Table definitions from load_dag carry the name resolved with the
+        default schema in "_silver_fullname", which is returned directly.
     """
+    if default_schema == "silver" and "_silver_fullname" in table_def:
+        return table_def["_silver_fullname"]
+
+    return _silver_table_name(
+        table_def.get("name"),
+        table_def.get("delta_table"),
+        default_schema
+    )
+
+
+@lru_cache(maxsize=4096)
+def _silver_table_name(
+    table_name: Optional[str],
+    delta_table: Optional[str],
+    default_schema: str
+) -> str:
+    """Memoized core of build_silver_table_name."""
     # Check if delta_table specifies Silver schema
-    delta_table = table_def.get("delta_table")
     if delta_table and delta_table.startswith("silver."):
         return delta_table
 
     # Otherwise use table name with default Silver schema
-    table_name = table_def.get("name")
     return f"{default_schema}.{table_name}"
 
 
@@ -382,21 +529,17 @@ def summarize_dag(dag: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Dict with counts by load_mode, enabled status, etc.
     """
-    tables = dag["tables"]
-    enabled = get_enabled_tables(dag)
-
-    # Count by load_mode
-    load_mode_counts = {}
-    for table in enabled:
-        mode = table.get("load_mode", "snapshot")
-        load_mode_counts[mode] = load_mode_counts.get(mode, 0) + 1
+    # All counts come from the single-pass DAG index
+    index = _dag_index(dag)
+    total = index["tables_len"]
+    enabled = len(index["enabled_tables"])
 
     return {
         "source": dag.get("source"),
-        "total_tables": len(tables),
-        "enabled_tables": len(enabled),
-        "disabled_tables": len(tables) - len(enabled),
-        "load_mode_counts": load_mode_counts,
+        "total_tables": total,
+        "enabled_tables": enabled,
+        "disabled_tables": total - enabled,
+        "load_mode_counts": dict(index["load_mode_counts"]),
     }
 
 
@@ -410,13 +553,12 @@ def load_runplan(runplan_path: str) -> List[Dict[str, Any]]:
     Returns:
         List of scheduled runs
     """
-    if not os.path.exists(runplan_path):
-        logger.warning(f"Runplan file not found: {runplan_path}")
+    try:
+        runplan = _load_json(runplan_path)
+    except FileNotFoundError:
+        logger.warning("Runplan file not found: %s", runplan_path)
         return []
 
-    with open(runplan_path, 'r') as f:
-        runplan = json.load(f)
-
     return runplan
 
 
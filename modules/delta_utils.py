@@ -4,18 +4,104 @@ Delta Lake Utilities
 Provides helper functions for working with Delta Lake tables.
 """
 
-from typing import Optional
-from pyspark.sql import SparkSession, functions as F
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+from pyspark.sql import Row, SparkSession
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+# Catalog listings per (session, schema): key -> (fetched_at, lowercased table names)
+_catalog_cache: Dict[Tuple[int, str], Tuple[float, FrozenSet[str]]] = {}
+CATALOG_CACHE_TTL_SECONDS = 60.0
+
+
+def invalidate_catalog_cache(schema: Optional[str] = None) -> None:
+    """
+    Forget cached catalog listings used by table_exists.
+
+    Args:
+        schema: Only drop listings for this schema (default: all schemas)
+    """
+    if schema is None:
+        _catalog_cache.clear()
+        return
+
+    schema_key = schema.strip("`").lower()
+    for key in [k for k in _catalog_cache if k[1] == schema_key]:
+        _catalog_cache.pop(key, None)
+
+
+def invalidate_table_cache(table_fullname: str) -> None:
+    """
+    Forget the cached catalog listing of a table's schema.
+
+    Call after creating or dropping a table, so table_exists sees the change
+    immediately instead of after CATALOG_CACHE_TTL_SECONDS.
+
+    Args:
+        table_fullname: Table name (schema.table); unqualified names clear all
+    """
+    invalidate_catalog_cache(table_fullname.rsplit(".", 1)[0] if "." in table_fullname else None)
+
+
+def _list_schema_tables(spark: SparkSession, schema: str) -> FrozenSet[str]:
+    """
+    Lowercased table names in a schema, from one SHOW TABLES per TTL.
+
+    SHOW TABLES only reads names from the metastore, where
+    catalog.listTables also resolves every table's metadata. Temporary
+    views are listed too (isTemporary = true) and are left out.
+    """
+    key = (id(spark), schema.lower())
+    now = time.monotonic()
+
+    cached = _catalog_cache.get(key)
+    if cached is None or now - cached[0] > CATALOG_CACHE_TTL_SECONDS:
+        rows = spark.sql(f"SHOW TABLES IN {schema}") \
+            .where("isTemporary = false") \
+            .select("tableName") \
+            .collect()
+        names = frozenset(row["tableName"].lower() for row in rows)
+        cached = (now, names)
+        _catalog_cache[key] = cached
+
+    return cached[1]
+
+
+def get_last_history_row(spark: SparkSession, table_fullname: str) -> Optional[Row]:
+    """
+    Get the latest commit of a Delta table from its history.
+
+    ``DESCRIBE HISTORY`` returns commits newest-first, so ``LIMIT 1`` reads only
+    the latest entry. Callers that need several fields of the last commit
+    (version, operationMetrics, ...) should fetch the row once through this.
+
+    Args:
+        spark: Active SparkSession
+        table_fullname: Full table name (schema.table)
+
+    Returns:
+        History Row of the latest commit, or None if the history is empty
+
+    Raises:
+        Exception: Propagates errors from DESCRIBE HISTORY (e.g. missing table)
+
+    Example:
+        >>> row = get_last_history_row(spark, "bronze.Dim_Relatie")
+        >>> version, metrics = row["version"], row["operationMetrics"]
+    """
+    return spark.sql(f"DESCRIBE HISTORY {table_fullname} LIMIT 1").first()
+
 
 def get_last_num_output_rows(spark: SparkSession, table_fullname: str) -> Optional[int]:
     """
     Get the number of written rows from the last Delta write operation.
 
-    Uses DESCRIBE HISTORY to extract numOutputRows from the most recent version.
+    Uses ``DESCRIBE HISTORY ... LIMIT 1`` so only the latest commit is read from
+    the Delta log (history is returned newest-first), instead of materializing
+    and sorting the full table history for every write.
 
     Args:
         spark: Active SparkSession
@@ -29,16 +115,12 @@ def get_last_num_output_rows(spark: SparkSession, table_fullname: str) -> Option
         >>> print(f"Last write: {rows:,} rows")
     """
     try:
-        history = spark.sql(f"DESCRIBE HISTORY {table_fullname}")
-        row = (
-            history
-            .orderBy(F.col("version").desc())
-            .select(F.col("operationMetrics")["numOutputRows"].alias("rows"))
-            .first()
-        )
-        return int(row["rows"]) if row and row["rows"] is not None else None
+        row = get_last_history_row(spark, table_fullname)
+        metrics = row["operationMetrics"] if row else None
+        rows = metrics.get("numOutputRows") if metrics else None
+        return int(rows) if rows is not None else None
     except Exception as e:
-        logger.warning(f"Failed to get numOutputRows for {table_fullname}: {e}")
+        logger.warning("Failed to get numOutputRows for %s: %s", table_fullname, e)
         return None
 
 
@@ -46,6 +128,8 @@ def get_delta_version(spark: SparkSession, table_fullname: str) -> Optional[int]
     """
     Get the current version number of a Delta table.
 
+    Reads only the latest history entry (see get_last_history_row).
+
     Args:
         spark: Active SparkSession
         table_fullname: Full table name (schema.table)
@@ -58,11 +142,10 @@ def get_delta_version(spark: SparkSession, table_fullname: str) -> Optional[int]
         >>> print(f"Current version: {version}")
     """
     try:
-        history = spark.sql(f"DESCRIBE HISTORY {table_fullname}")
-        latest = history.orderBy(F.col("version").desc()).first()
+        latest = get_last_history_row(spark, table_fullname)
         return int(latest["version"]) if latest else None
     except Exception as e:
-        logger.warning(f"Failed to get version for {table_fullname}: {e}")
+        logger.warning("Failed to get version for %s: %s", table_fullname, e)
         return None
 
 
@@ -70,6 +153,10 @@ def table_exists(spark: SparkSession, table_fullname: str) -> bool:
     """
     Check if a Delta table exists in the catalog.
 
+    Schema-qualified names are answered from a cached listing of the schema
+    (refreshed after CATALOG_CACHE_TTL_SECONDS or invalidate_catalog_cache),
+    so checking many tables costs one metastore call per schema.
+
     Args:
         spark: Active SparkSession
         table_fullname: Full table name (schema.table)
@@ -81,13 +168,26 @@ def table_exists(spark: SparkSession, table_fullname: str) -> bool:
         >>> if table_exists(spark, "bronze.Dim_Relatie"):
         ...     print("Table exists")
     """
-    return spark.catalog.tableExists(table_fullname)
+    if "." not in table_fullname:
+        return spark.catalog.tableExists(table_fullname)
+
+    schema, table = table_fullname.rsplit(".", 1)
+    try:
+        return table.strip("`").lower() in _list_schema_tables(spark, schema.strip("`"))
+    except Exception:
+        # Schema missing or listing not supported: ask the catalog directly
+        return spark.catalog.tableExists(table_fullname)
 
 
 def get_table_size(spark: SparkSession, table_fullname: str) -> Optional[int]:
     """
     Get the number of rows in a Delta table.
 
+    A bare count over a Delta table is answered from the per-file
+    ``numRecords`` stats in the transaction log
+    (``spark.databricks.delta.optimizeMetadataQuery.enabled``), without a
+    data scan; Delta scans by itself when stats are missing.
+
     Args:
         spark: Active SparkSession
         table_fullname: Full table name (schema.table)
@@ -104,11 +204,16 @@ def get_table_size(spark: SparkSession, table_fullname: str) -> Optional[int]:
             return None
         return spark.table(table_fullname).count()
     except Exception as e:
-        logger.warning(f"Failed to get table size for {table_fullname}: {e}")
+        logger.warning("Failed to get table size for %s: %s", table_fullname, e)
         return None
 
 
-def optimize_table(spark: SparkSession, table_fullname: str, zorder_cols: Optional[list] = None) -> None:
+def optimize_table(
+    spark: SparkSession,
+    table_fullname: str,
+    zorder_cols: Optional[list] = None,
+    where: Optional[str] = None
+) -> None:
     """
     Optimize a Delta table (compact small files, optionally Z-ORDER).
 
@@ -116,6 +221,8 @@ def optimize_table(spark: SparkSession, table_fullname: str, zorder_cols: Option
         spark: Active SparkSession
         table_fullname: Full table name (schema.table)
         zorder_cols: Optional list of columns for Z-ORDER BY
+        where: Optional partition predicate (SQL) limiting OPTIMIZE to the
+            matching partitions; only partition columns are allowed
 
     Example:
         >>> # Basic optimize
@@ -123,17 +230,24 @@ def optimize_table(spark: SparkSession, table_fullname: str, zorder_cols: Option
         >>>
         >>> # With Z-ORDER
         >>> optimize_table(spark, "bronze.Dim_Relatie", ["Rel_Id", "Updatedatum"])
+        >>>
+        >>> # Only one partition
+        >>> optimize_table(spark, "bronze.Dim_Relatie", ["Rel_Id"], "_bronze_load_ts = '20251105T142752505'")
     """
+    statement = f"OPTIMIZE {table_fullname}"
+    if where:
+        statement += f" WHERE {where}"
+
     try:
         if zorder_cols:
             zorder_clause = ", ".join(zorder_cols)
-            spark.sql(f"OPTIMIZE {table_fullname} ZORDER BY ({zorder_clause})")
-            logger.info(f"Optimized {table_fullname} with ZORDER BY ({zorder_clause})")
+            spark.sql(f"{statement} ZORDER BY ({zorder_clause})")
+            logger.info("Optimized %s with ZORDER BY (%s)", table_fullname, zorder_clause)
         else:
-            spark.sql(f"OPTIMIZE {table_fullname}")
-            logger.info(f"Optimized {table_fullname}")
+            spark.sql(statement)
+            logger.info("Optimized %s", table_fullname)
     except Exception as e:
-        logger.error(f"Failed to optimize {table_fullname}: {e}")
+        logger.error("Failed to optimize %s: %s", table_fullname, e)
         raise
 
 
@@ -155,9 +269,9 @@ def vacuum_table(spark: SparkSession, table_fullname: str, retention_hours: int
     """
     try:
         spark.sql(f"VACUUM {table_fullname} RETAIN {retention_hours} HOURS")
-        logger.info(f"Vacuumed {table_fullname} (retention: {retention_hours}h)")
+        logger.info("Vacuumed %s (retention: %sh)", table_fullname, retention_hours)
     except Exception as e:
-        logger.error(f"Failed to vacuum {table_fullname}: {e}")
+        logger.error("Failed to vacuum %s: %s", table_fullname, e)
         raise
 
 
@@ -177,11 +291,11 @@ def get_table_location(spark: SparkSession, table_fullname: str) -> Optional[str
         >>> print(f"Table location: {location}")
     """
     try:
-        desc = spark.sql(f"DESCRIBE EXTENDED {table_fullname}")
-        location_row = desc.where("col_name = 'Location'").first()
-        return location_row["data_type"] if location_row else None
+        # DESCRIBE DETAIL returns a single row with a location column
+        detail = spark.sql(f"DESCRIBE DETAIL {table_fullname}").first()
+        return detail["location"] if detail else None
     except Exception as e:
-        logger.warning(f"Failed to get location for {table_fullname}: {e}")
+        logger.warning("Failed to get location for %s: %s", table_fullname, e)
         return None
 
 
@@ -189,6 +303,11 @@ def drop_table_if_exists(spark: SparkSession, table_fullname: str) -> bool:
     """
     Drop a Delta table if it exists.
 
+    The DROP itself uses IF EXISTS, so it is always safe. The return value
+    comes from the cached schema listing used by table_exists and can be
+    stale for up to CATALOG_CACHE_TTL_SECONDS if the table was created or
+    dropped outside this session.
+
     Args:
         spark: Active SparkSession
         table_fullname: Full table name (schema.table)
@@ -201,13 +320,15 @@ def drop_table_if_exists(spark: SparkSession, table_fullname: str) -> bool:
         ...     print("Table dropped")
     """
     try:
-        if table_exists(spark, table_fullname):
-            spark.sql(f"DROP TABLE {table_fullname}")
-            logger.info(f"Dropped table: {table_fullname}")
-            return True
-        return False
+        existed = table_exists(spark, table_fullname)
+        spark.sql(f"DROP TABLE IF EXISTS {table_fullname}")
+        invalidate_table_cache(table_fullname)
+
+        if existed:
+            logger.info("Dropped table: %s", table_fullname)
+        return existed
     except Exception as e:
-        logger.error(f"Failed to drop table {table_fullname}: {e}")
+        logger.error("Failed to drop table %s: %s", table_fullname, e)
         raise
 
 
@@ -226,10 +347,141 @@ def analyze_table(spark: SparkSession, table_fullname: str, compute_stats: bool
     try:
         if compute_stats:
             spark.sql(f"ANALYZE TABLE {table_fullname} COMPUTE STATISTICS FOR ALL COLUMNS")
-            logger.info(f"Analyzed {table_fullname} with column statistics")
+            logger.info("Analyzed %s with column statistics", table_fullname)
         else:
             spark.sql(f"ANALYZE TABLE {table_fullname} COMPUTE STATISTICS")
-            logger.info(f"Analyzed {table_fullname}")
+            logger.info("Analyzed %s", table_fullname)
     except Exception as e:
-        logger.error(f"Failed to analyze {table_fullname}: {e}")
+        logger.error("Failed to analyze %s: %s", table_fullname, e)
         raise
+
+
+def _run_maintenance_parallel(
+    spark: SparkSession,
+    table_fullnames: List[str],
+    operation: Callable[[str], None],
+    max_parallel: int,
+    label: str
+) -> Dict[str, Optional[str]]:
+    """
+    Run a per-table maintenance operation concurrently.
+
+    The operations are independent across tables, so they are submitted from a
+    thread pool into the FAIR scheduler pool "maintenance" and overlap their
+    planning/metadata phases. Failures are collected, not raised.
+
+    Returns:
+        Dict mapping table name -> None on success, or the error message
+    """
+    if not table_fullnames:
+        return {}
+
+    sc = spark.sparkContext
+
+    def _run(table_fullname: str) -> None:
+        sc.setLocalProperty("spark.scheduler.pool", "maintenance")
+        try:
+            operation(table_fullname)
+        finally:
+            sc.setLocalProperty("spark.scheduler.pool", None)
+
+    results: Dict[str, Optional[str]] = {}
+    workers = max(1, min(max_parallel, len(table_fullnames)))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{label}_pool") as executor:
+        futures = {executor.submit(_run, name): name for name in table_fullnames}
+        for future in as_completed(futures):
+            name = futures[future]
+            exc = future.exception()
+            results[name] = str(exc)[:500] if exc else None
+
+    failed = sum(1 for err in results.values() if err)
+    logger.info("%s: %s/%s tables succeeded", label, len(results) - failed, len(results))
+
+    return results
+
+
+def optimize_tables(
+    spark: SparkSession,
+    table_fullnames: List[str],
+    zorder_map: Optional[Dict[str, list]] = None,
+    max_parallel: int = 8
+) -> Dict[str, Optional[str]]:
+    """
+    Optimize several Delta tables concurrently (see optimize_table).
+
+    Args:
+        spark: Active SparkSession
+        table_fullnames: Full table names (schema.table)
+        zorder_map: Optional table name -> Z-ORDER columns
+        max_parallel: Maximum concurrent OPTIMIZE statements (default: 8)
+
+    Returns:
+        Dict mapping table name -> None on success, or the error message
+
+    Example:
+        >>> errors = optimize_tables(spark, ["bronze.A", "bronze.B"], {"bronze.A": ["Id"]})
+        >>> failed = [t for t, err in errors.items() if err]
+    """
+    zorder_map = zorder_map or {}
+    return _run_maintenance_parallel(
+        spark,
+        table_fullnames,
+        lambda t: optimize_table(spark, t, zorder_map.get(t)),
+        max_parallel,
+        "optimize"
+    )
+
+
+def vacuum_tables(
+    spark: SparkSession,
+    table_fullnames: List[str],
+    retention_hours: int = 168,
+    max_parallel: int = 8
+) -> Dict[str, Optional[str]]:
+    """
+    Vacuum several Delta tables concurrently (see vacuum_table).
+
+    Args:
+        spark: Active SparkSession
+        table_fullnames: Full table names (schema.table)
+        retention_hours: Retention period in hours (default: 168 = 7 days)
+        max_parallel: Maximum concurrent VACUUM statements (default: 8)
+
+    Returns:
+        Dict mapping table name -> None on success, or the error message
+    """
+    return _run_maintenance_parallel(
+        spark,
+        table_fullnames,
+        lambda t: vacuum_table(spark, t, retention_hours),
+        max_parallel,
+        "vacuum"
+    )
+
+
+def analyze_tables(
+    spark: SparkSession,
+    table_fullnames: List[str],
+    compute_stats: bool = True,
+    max_parallel: int = 8
+) -> Dict[str, Optional[str]]:
+    """
+    Analyze several Delta tables concurrently (see analyze_table).
+
+    Args:
+        spark: Active SparkSession
+        table_fullnames: Full table names (schema.table)
+        compute_stats: If True, compute column statistics (default: True)
+        max_parallel: Maximum concurrent ANALYZE statements (default: 8)
+
+    Returns:
+        Dict mapping table name -> None on success, or the error message
+    """
+    return _run_maintenance_parallel(
+        spark,
+        table_fullnames,
+        lambda t: analyze_table(spark, t, compute_stats),
+        max_parallel,
+        "analyze"
+    )
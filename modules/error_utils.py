@@ -5,9 +5,176 @@ Provides heuristic error detection for common failure scenarios across Bronze, S
 """
 
 import logging
+import re
+from typing import Iterator, Optional, Union
 
 logger = logging.getLogger(__name__)
 
+# Needles per error category, in priority order (first matching category
+# wins). Each rule is a tuple of lowercase substrings that must all occur in
+# the message; single-needle rules are plain substring matches.
+_CATEGORY_RULES = (
+    ("MISSING_PATH", (
+        ("path does not exist",), ("no such file or directory",), ("file not found",),
+        ("cannot find path",), ("path not found",),
+    )),
+    ("CORRUPT_DELTA", (
+        ("is not a delta table",), ("failed to merge fields",), ("incompatible format",),
+        ("cannot find delta log",), ("protocol", "unsupported"), ("delta log", "error"),
+    )),
+    ("SCHEMA_MISMATCH", (
+        ("schema mismatch",), ("cannot resolve",), ("column not found",),
+        ("mismatched input",), ("incompatible schema",),
+    )),
+    ("TIMEOUT", (
+        ("timeout",), ("timed out",), ("out of memory",), ("oom",),
+        ("resource exhausted",), ("deadline exceeded",),
+    )),
+    ("CONNECTION", (
+        ("connection refused",), ("connection failed",), ("network error",),
+        ("cannot connect",), ("authentication failed",), ("login failed",),
+        ("connection timeout",),
+    )),
+)
+
+
+def _compile_rules(rules) -> "re.Pattern":
+    """One case-insensitive alternation for a category (lookaheads for AND rules)."""
+    alternatives = []
+    for needles in rules:
+        if len(needles) == 1:
+            alternatives.append(re.escape(needles[0]))
+        else:
+            alternatives.append("^" + "".join(f"(?=.*{re.escape(n)})" for n in needles))
+    return re.compile("|".join(alternatives), re.IGNORECASE | re.DOTALL)
+
+
+_RULES_BY_CATEGORY = dict(_CATEGORY_RULES)
+
+# One precompiled pattern per error category
+_MISSING_PATH_RE = _compile_rules(_RULES_BY_CATEGORY["MISSING_PATH"])
+_CORRUPT_DELTA_RE = _compile_rules(_RULES_BY_CATEGORY["CORRUPT_DELTA"])
+_SCHEMA_MISMATCH_RE = _compile_rules(_RULES_BY_CATEGORY["SCHEMA_MISMATCH"])
+_TIMEOUT_RE = _compile_rules(_RULES_BY_CATEGORY["TIMEOUT"])
+_CONNECTION_RE = _compile_rules(_RULES_BY_CATEGORY["CONNECTION"])
+
+# Optional: one Aho-Corasick automaton over every needle, so classify_error
+# finds all needles of all categories in a single pass over the message
+def _build_needle_automaton():
+    """Aho-Corasick automaton over all rule needles, or None without pyahocorasick."""
+    try:
+        import ahocorasick  # type: ignore
+    except ImportError:
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for _, rules in _CATEGORY_RULES:
+        for needles in rules:
+            for needle in needles:
+                automaton.add_word(needle, needle)
+    automaton.make_automaton()
+    return automaton
+
+
+_NEEDLE_AUTOMATON = _build_needle_automaton()
+
+
+def _classify_with_automaton(msg: str) -> str:
+    """Category from the needles found in one automaton pass (same priority)."""
+    found = {needle for _, needle in _NEEDLE_AUTOMATON.iter(msg.lower())}
+    if not found:
+        return "UNKNOWN"
+
+    for category, rules in _CATEGORY_RULES:
+        if any(all(n in found for n in needles) for needles in rules):
+            return category
+
+    return "UNKNOWN"
+
+
+def _exc_message(exc: Exception) -> str:
+    """
+    str(exc), computed once per exception object.
+
+    Wrapped Spark/Py4J exceptions render the full JVM stack trace on every
+    str() call, so the message is stashed on the exception for later checks.
+    """
+    msg = getattr(exc, "_err_msg", None)
+    if msg is None:
+        msg = str(exc)
+        try:
+            exc._err_msg = msg
+        except (AttributeError, TypeError):
+            pass  # exceptions without a writable __dict__
+    return msg
+
+
+# Appended by truncate_error_message when a message is cut
+_TRUNC_SUFFIX = "... [TRUNCATED]"
+
+# Exception classes whose type alone decides the category (matched on the
+# class and its bases, e.g. ConnectionRefusedError -> ConnectionError)
+_TYPE_CATEGORIES = {
+    "FileNotFoundError": "MISSING_PATH",
+    "FileNotFoundException": "MISSING_PATH",
+    "TimeoutError": "TIMEOUT",
+    "MemoryError": "TIMEOUT",
+    "ConnectionError": "CONNECTION",
+}
+
+# Max exceptions inspected along the __cause__/__context__ chain
+_MAX_CHAIN_DEPTH = 5
+
+
+def _iter_exception_chain(exc: BaseException) -> Iterator[BaseException]:
+    """
+    Yield exc, then the exceptions it was raised from (at most _MAX_CHAIN_DEPTH).
+
+    Follows __cause__, and __context__ only when it is not suppressed
+    (``raise ... from None``), like the traceback printer does.
+    """
+    seen = 0
+    while exc is not None and seen < _MAX_CHAIN_DEPTH:
+        yield exc
+        if exc.__cause__ is not None:
+            exc = exc.__cause__
+        elif not exc.__suppress_context__:
+            exc = exc.__context__
+        else:
+            exc = None
+        seen += 1
+
+
+def _category_from_type(exc: BaseException) -> Optional[str]:
+    """Category implied by the exception class (or a base class), or None."""
+    for cls in type(exc).__mro__:
+        category = _TYPE_CATEGORIES.get(cls.__name__)
+        if category:
+            return category
+    return None
+
+
+# Checked in order: the first matching category wins
+_ERROR_CATEGORIES = (
+    ("MISSING_PATH", _MISSING_PATH_RE),
+    ("CORRUPT_DELTA", _CORRUPT_DELTA_RE),
+    ("SCHEMA_MISMATCH", _SCHEMA_MISMATCH_RE),
+    ("TIMEOUT", _TIMEOUT_RE),
+    ("CONNECTION", _CONNECTION_RE),
+)
+
+
+def _category_from_message(msg: str) -> str:
+    """Category of a message by the rules in priority order, or "UNKNOWN"."""
+    if _NEEDLE_AUTOMATON is not None:
+        return _classify_with_automaton(msg)
+
+    for name, pattern in _ERROR_CATEGORIES:
+        if pattern.search(msg):
+            return name
+
+    return "UNKNOWN"
+
 
 def is_missing_path_error(exc: Exception) -> bool:
     """
@@ -31,14 +198,7 @@ def is_missing_path_error(exc: Exception) -> bool:
         ...     if is_missing_path_error(e):
         ...         print("No files found - table not exported")
     """
-    msg = str(exc).lower()
-    return (
-        "path does not exist" in msg
-        or "no such file or directory" in msg
-        or "file not found" in msg
-        or "cannot find path" in msg
-        or "path not found" in msg
-    )
+    return _MISSING_PATH_RE.search(_exc_message(exc)) is not None
 
 
 def is_probably_corrupt_delta(exc: Exception) -> bool:
@@ -65,15 +225,7 @@ def is_probably_corrupt_delta(exc: Exception) -> bool:
         ...         spark.sql("DROP TABLE IF EXISTS bronze.table")
         ...         # Recreate table
     """
-    msg = str(exc).lower()
-    return (
-        "is not a delta table" in msg
-        or "failed to merge fields" in msg
-        or "incompatible format" in msg
-        or ("protocol" in msg and "unsupported" in msg)
-        or ("delta log" in msg and "error" in msg)
-        or "cannot find delta log" in msg
-    )
+    return _CORRUPT_DELTA_RE.search(_exc_message(exc)) is not None
 
 
 def is_schema_mismatch_error(exc: Exception) -> bool:
@@ -99,14 +251,7 @@ def is_schema_mismatch_error(exc: Exception) -> bool:
         ...         # Enable schema evolution
         ...         df.write.option("mergeSchema", "true").save(table)
     """
-    msg = str(exc).lower()
-    return (
-        "schema mismatch" in msg
-        or "cannot resolve" in msg
-        or "column not found" in msg
-        or "mismatched input" in msg
-        or "incompatible schema" in msg
-    )
+    return _SCHEMA_MISMATCH_RE.search(_exc_message(exc)) is not None
 
 
 def is_timeout_error(exc: Exception) -> bool:
@@ -132,15 +277,7 @@ def is_timeout_error(exc: Exception) -> bool:
         ...     if is_timeout_error(e):
         ...         # Retry with more resources or partitioning
     """
-    msg = str(exc).lower()
-    return (
-        "timeout" in msg
-        or "timed out" in msg
-        or "out of memory" in msg
-        or "oom" in msg
-        or "resource exhausted" in msg
-        or "deadline exceeded" in msg
-    )
+    return _TIMEOUT_RE.search(_exc_message(exc)) is not None
 
 
 def is_connection_error(exc: Exception) -> bool:
@@ -166,16 +303,7 @@ def is_connection_error(exc: Exception) -> bool:
         ...     if is_connection_error(e):
         ...         # Retry connection
     """
-    msg = str(exc).lower()
-    return (
-        "connection refused" in msg
-        or "connection failed" in msg
-        or "network error" in msg
-        or "cannot connect" in msg
-        or "authentication failed" in msg
-        or "login failed" in msg
-        or "connection timeout" in msg
-    )
+    return _CONNECTION_RE.search(_exc_message(exc)) is not None
 
 
 def classify_error(exc: Exception) -> str:
@@ -201,26 +329,35 @@ def classify_error(exc: Exception) -> str:
         ...     error_type = classify_error(e)
         ...     logger.error(f"Error type: {error_type}, message: {str(e)}")
     """
-    if is_missing_path_error(exc):
-        return "MISSING_PATH"
-    elif is_probably_corrupt_delta(exc):
-        return "CORRUPT_DELTA"
-    elif is_schema_mismatch_error(exc):
-        return "SCHEMA_MISMATCH"
-    elif is_timeout_error(exc):
-        return "TIMEOUT"
-    elif is_connection_error(exc):
-        return "CONNECTION"
-    else:
-        return "UNKNOWN"
+    cached = getattr(exc, "_classified", None)
+    if cached is not None:
+        return cached
+
+    # Per exception, outermost first: cheap class lookup, then the message
+    # heuristics (Py4JJavaError, AnalysisException, ...: the Java class is in
+    # the message). A chained exception never overrides the outer one.
+    category = "UNKNOWN"
+    for link in _iter_exception_chain(exc):
+        found = _category_from_type(link) or _category_from_message(_exc_message(link))
+        if found != "UNKNOWN":
+            category = found
+            break
 
+    try:
+        exc._classified = category
+    except (AttributeError, TypeError):
+        pass
 
-def truncate_error_message(error_msg: str, max_length: int = 1000) -> str:
+    return category
+
+
+def truncate_error_message(error_msg: Union[str, Exception], max_length: int = 1000) -> str:
     """
     Truncate error messages to prevent bloating log tables.
 
     Args:
-        error_msg: Error message to truncate
+        error_msg: Error message to truncate, or the exception itself (its
+            message is rendered once and shared with the is_* checks)
         max_length: Maximum length (default: 1000)
 
     Returns:
@@ -232,10 +369,13 @@ def truncate_error_message(error_msg: str, max_length: int = 1000) -> str:
         >>> len(truncated) <= 120  # 100 + "... [TRUNCATED]"
         True
     """
+    if isinstance(error_msg, BaseException):
+        error_msg = _exc_message(error_msg)
+
     if not error_msg:
         return ""
 
     if len(error_msg) <= max_length:
         return error_msg
 
-    return error_msg[:max_length] + "... [TRUNCATED]"
+    return f"{error_msg[:max_length]}{_TRUNC_SUFFIX}"
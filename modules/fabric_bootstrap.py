@@ -34,8 +34,8 @@ Date: 2025-12-03
 import os
 import sys
 import logging
-from pathlib import Path
-from typing import Optional, List
+from functools import lru_cache
+from typing import Dict, Iterator, Optional, List, Tuple
 
 # Module-level logger
 logger = logging.getLogger(__name__)
@@ -46,10 +46,20 @@ _bootstrap_completed = False
 # Default module folder name (can be overridden)
 DEFAULT_MODULE_FOLDER = "code"
 
+# Results of _find_module_paths, keyed by (module_folder, cwd, FABRIC_CODE_PATH)
+_PATH_CACHE: Dict[Tuple[str, str, Optional[str]], List[str]] = {}
 
+# Path added to sys.path by the last successful bootstrap, per module folder
+_LAST_BOOTSTRAP_PATH: Dict[str, str] = {}
+
+
+@lru_cache(maxsize=1)
 def _is_fabric_environment() -> bool:
     """
     Detect if running in Microsoft Fabric.
+
+    Cached for the session (the mount and service variable don't change
+    while the notebook runs); reset_bootstrap() clears it.
     
     Checks multiple indicators:
     1. Filesystem: Presence of /lakehouse/default (Most reliable)
@@ -59,7 +69,7 @@ def _is_fabric_environment() -> bool:
         bool: True if in Fabric environment
     """
     # Check 1: Physical filesystem structure (Primary)
-    if os.path.exists('/lakehouse/default'):
+    if os.path.isdir('/lakehouse/default'):
         return True
         
     # Check 2: Environment variable (Secondary/Confirmation)
@@ -111,72 +121,133 @@ def _get_workspace_info() -> Optional[dict]:
         return None
 
 
+def _find_cluster_module_path(cluster_root: str, module_folder: str) -> Optional[str]:
+    """
+    Find <cluster_root>[/<lakehouse>]/Files/{module_folder} on a cluster mount.
+
+    Uses os.scandir on the root only (DirEntry type info avoids a stat per
+    lakehouse) and returns the first match.
+
+    Returns:
+        str: The module path, or None if no lakehouse has one
+    """
+    direct = os.path.join(cluster_root, "Files", module_folder)
+    if os.path.isdir(direct):
+        return direct
+
+    try:
+        with os.scandir(cluster_root) as entries:
+            for entry in entries:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                code_path = os.path.join(entry.path, "Files", module_folder)
+                if os.path.isdir(code_path):
+                    return code_path
+    except OSError as e:
+        logger.debug(f"Could not scan cluster root {cluster_root}: {e}")
+
+    return None
+
+
 def _find_module_paths(module_folder: str = DEFAULT_MODULE_FOLDER) -> List[str]:
     """
     Find all possible module paths using multiple detection strategies.
 
+    Results are cached per module folder (and working directory /
+    FABRIC_CODE_PATH, which the relative strategies depend on), so
+    ensure_module_path/get_module_path/verify_module_path probe the
+    filesystem once. reset_bootstrap() clears the cache.
+
     Args:
         module_folder: Name of the folder containing modules (e.g., 'code')
 
     Returns:
         List[str]: List of candidate paths, ordered by priority
     """
-    candidates = []
+    cache_key = (module_folder, os.getcwd(), os.getenv('FABRIC_CODE_PATH'))
+    cached = _PATH_CACHE.get(cache_key)
+    if cached is not None:
+        return list(cached)
+
+    candidates = list(_iter_module_paths(module_folder))
+    _PATH_CACHE[cache_key] = candidates
+    return list(candidates)
+
+
+def _first_module_path(module_folder: str = DEFAULT_MODULE_FOLDER) -> Optional[str]:
+    """
+    Return the highest-priority module path, stopping at the first hit.
+
+    Uses the _find_module_paths cache when it is filled; otherwise only runs
+    strategies until one produces a path (on Fabric that is Strategy 1).
+    """
+    cached = _PATH_CACHE.get((module_folder, os.getcwd(), os.getenv('FABRIC_CODE_PATH')))
+    if cached is not None:
+        return cached[0] if cached else None
+    return next(_iter_module_paths(module_folder), None)
+
+
+def _iter_module_paths(module_folder: str) -> Iterator[str]:
+    """Lazily yield the candidates of _find_module_paths (uncached)."""
+    probed = set()
+
+    def _probe(path: Optional[str], label: str) -> bool:
+        # Stat each distinct path at most once and keep the first occurrence
+        if not path or path in probed:
+            return False
+        probed.add(path)
+        if os.path.isdir(path):
+            logger.debug(f"Found {label} path: {path}")
+            return True
+        return False
+
+    fabric_path = f"/lakehouse/default/Files/{module_folder}"
 
     # Strategy 1: Fabric default lakehouse mount point
-    if _is_fabric_environment():
-        fabric_path = f"/lakehouse/default/Files/{module_folder}"
-        if os.path.exists(fabric_path):
-            candidates.append(fabric_path)
-            logger.debug(f"Found Fabric lakehouse path: {fabric_path}")
+    if _is_fabric_environment() and _probe(fabric_path, "Fabric lakehouse"):
+        yield fabric_path
 
     # Strategy 2: Environment variable override
-    env_code_path = os.getenv('FABRIC_CODE_PATH')
-    if env_code_path and os.path.exists(env_code_path):
-        candidates.append(env_code_path)
-        logger.debug(f"Found environment variable path: {env_code_path}")
+    env_path = os.getenv('FABRIC_CODE_PATH')
+    if _probe(env_path, "environment variable"):
+        yield env_path
 
     # Strategy 3: Search common Fabric locations
-    common_fabric_locations = [
-        f"/lakehouse/default/Files/{module_folder}",
+    # (the default lakehouse path is skipped here if Strategy 1 already probed it)
+    for location in (
+        fabric_path,
         f"/lakehouse/default/{module_folder}",
         f"/workspace/Files/{module_folder}",
-    ]
-
-    for location in common_fabric_locations:
-        if os.path.exists(location) and location not in candidates:
-            candidates.append(location)
-            #logger.debug(f"Found common Fabric location: {location}")
+    ):
+        if _probe(location, "common Fabric location"):
+            yield location
 
     # Strategy 4: Cluster environment (OneLake mount)
     cluster_root = "/data/lakehouse"
-    if os.path.exists(cluster_root):
-        # Search for Files/{module_folder} under any lakehouse
-        for root, dirs, files in os.walk(cluster_root):
-            if root.endswith(f"/Files/{module_folder}") or root.endswith(f"/Files"):
-                code_path = os.path.join(root, module_folder) if not root.endswith(module_folder) else root
-                if os.path.exists(code_path) and code_path not in candidates:
-                    candidates.append(code_path)
-                    logger.debug(f"Found cluster path: {code_path}")
-                    break  # Stop after first match for performance
+    if os.path.isdir(cluster_root):
+        # Lakehouses are mounted as <cluster_root>/<lakehouse>/Files, so only
+        # probe Files/{module_folder} one level down instead of walking the tree
+        code_path = _find_cluster_module_path(cluster_root, module_folder)
+        if code_path and code_path not in probed:
+            probed.add(code_path)
+            logger.debug(f"Found cluster path: {code_path}")
+            yield code_path
 
     # Strategy 5: Relative path (local development)
     relative_path = os.path.abspath(module_folder)
-    if os.path.exists(relative_path) and relative_path not in candidates:
-        candidates.append(relative_path)
-        logger.debug(f"Found relative path: {relative_path}")
+    if _probe(relative_path, "relative"):
+        yield relative_path
 
     # Strategy 6: Parent directory search (notebooks in subdirectory)
-    current_dir = Path.cwd()
-    for i in range(3):  # Search up to 3 levels up
-        parent = current_dir.parents[i] if i < len(current_dir.parents) else None
-        if parent:
-            parent_code = parent / module_folder
-            if parent_code.exists() and str(parent_code) not in candidates:
-                candidates.append(str(parent_code))
-                logger.debug(f"Found parent directory path: {parent_code}")
-
-    return candidates
+    current_dir = os.getcwd()
+    for _ in range(3):  # Search up to 3 levels up
+        parent = os.path.dirname(current_dir)
+        if parent == current_dir:  # reached the filesystem root
+            break
+        parent_path = os.path.join(parent, module_folder)
+        if _probe(parent_path, "parent directory"):
+            yield parent_path
+        current_dir = parent
 
 
 def ensure_module_path(
@@ -221,10 +292,19 @@ def ensure_module_path(
     """
     global _bootstrap_completed
 
+    # A forced run re-probes the filesystem
+    if force:
+        _PATH_CACHE.clear()
+        _LAST_BOOTSTRAP_PATH.clear()
+        _is_fabric_environment.cache_clear()
+
     # Skip if already completed (unless forced)
     if _bootstrap_completed and not force:
         if verbose:
             logger.info("Bootstrap already completed, skipping...")
+        last_path = _LAST_BOOTSTRAP_PATH.get(module_folder)
+        if last_path is not None:
+            return last_path
         # Find existing path in sys.path
         for path in sys.path:
             if module_folder in path and os.path.exists(path):
@@ -242,8 +322,12 @@ def ensure_module_path(
         if workspace_info:
             logger.info(f"Workspace info: {workspace_info}")
 
-    # Find all candidate paths
-    candidates = _find_module_paths(module_folder)
+    # Verbose runs report every candidate; otherwise stop at the first one
+    if verbose:
+        candidates = _find_module_paths(module_folder)
+    else:
+        first = _first_module_path(module_folder)
+        candidates = [first] if first else []
 
     if not candidates:
         # This is NOT an error anymore, because we assume modules might 
@@ -264,6 +348,7 @@ def ensure_module_path(
 
     # Mark bootstrap as completed
     _bootstrap_completed = True
+    _LAST_BOOTSTRAP_PATH[module_folder] = module_path
 
     if verbose and len(candidates) > 1:
         logger.info(f"Note: Found {len(candidates)} possible paths, using: {module_path}")
@@ -287,8 +372,7 @@ def get_module_path(module_folder: str = DEFAULT_MODULE_FOLDER) -> Optional[str]
         >>> print(f"Modules are located at: {path}")
         Modules are located at: /lakehouse/default/Files/code
     """
-    candidates = _find_module_paths(module_folder)
-    return candidates[0] if candidates else None
+    return _first_module_path(module_folder)
 
 
 def verify_module_path(module_folder: str = DEFAULT_MODULE_FOLDER) -> bool:
@@ -325,7 +409,11 @@ def reset_bootstrap():
     Reset bootstrap state (mainly for testing).
 
     This does NOT remove paths from sys.path, it only resets
-    the internal flag that tracks if bootstrap has run.
+    the internal flag that tracks if bootstrap has run and the
+    cached environment detection / module path search results.
     """
     global _bootstrap_completed
-    _bootstrap_completed = False
\ No newline at end of file
+    _bootstrap_completed = False
+    _PATH_CACHE.clear()
+    _LAST_BOOTSTRAP_PATH.clear()
+    _is_fabric_environment.cache_clear()
\ No newline at end of file
@@ -2,17 +2,31 @@
 Hash Utilities for Bronze and Silver Processing
 
 Provides functions for calculating row-level hashes for Change Data Capture (CDC)
-and data quality validation. Uses SHA256 hashing with PySpark for distributed processing.
+and data quality validation. Uses SHA256 hashing with PySpark for distributed processing,
+or xxhash64 (64-bit LongType) when a cheaper non-cryptographic CDC hash is enough.
 
 Author: Albert @ QBIDS
 Created: 2025-11-25
 """
 
-from typing import Optional, List, Set
+from typing import Literal, Optional, List, Set
 from pyspark.sql import DataFrame
 from pyspark.sql.functions import (
-    sha2, concat_ws, col, coalesce, lit, when, array, concat,
-    collect_list, explode, struct, sum as spark_sum
+    sha2, concat_ws, col, coalesce, lit, when, sum as spark_sum, xxhash64,
+    count, first, length, broadcast
+)
+
+SUPPORTED_HASH_ALGORITHMS = ("sha256", "md5", "xxhash64")
+
+# Rows read by validate_hash_columns(mode="sample")
+HASH_VALIDATION_SAMPLE_ROWS = 1000
+
+# compare_hash_differences change types and their result keys
+_CHANGE_TYPE_KEYS = (
+    ("INSERT", "inserts"),
+    ("UPDATE", "updates"),
+    ("DELETE", "deletes"),
+    ("UNCHANGED", "unchanged"),
 )
 
 
@@ -33,6 +47,14 @@ def add_row_hash(
     2. Replacing NULLs with a null_token
     3. Concatenating with separator
     4. Applying SHA256 hash
+
+    With hash_algorithm="xxhash64" the typed columns are hashed directly into a
+    64-bit LongType value (no string cast, no concatenation): 8 bytes per row
+    instead of a 64-char hex string, and hash comparisons in CDC joins become
+    integer compares. xxhash64 skips NULL inputs, so a NULL-indicator per
+    column is hashed along to keep (NULL, x) and (x, NULL) apart. The hash
+    depends on column types, so a type change re-hashes every row. Existing
+    tables keep their string hashes; only switch for new tables.
     
     Args:
         df: Input DataFrame
@@ -41,7 +63,7 @@ def add_row_hash(
         exclude_cols: List of columns to exclude from hash (applied after include_cols)
         null_token: String to represent NULL values (default: "∅")
         separator: String to separate column values (default: "|")
-        hash_algorithm: Hash algorithm - "sha256" or "md5" (default: "sha256")
+        hash_algorithm: Hash algorithm - "sha256", "md5" or "xxhash64" (default: "sha256")
     
     Returns:
         DataFrame with added hash column
@@ -62,10 +84,12 @@ def add_row_hash(
         raise ValueError(f"Column '{hash_column}' already exists in DataFrame")
     
     # Validate hash algorithm
-    if hash_algorithm not in ("sha256", "md5"):
-        raise ValueError(f"Unsupported hash_algorithm: {hash_algorithm}. Use 'sha256' or 'md5'.")
+    if hash_algorithm not in SUPPORTED_HASH_ALGORITHMS:
+        raise ValueError(
+            f"Unsupported hash_algorithm: {hash_algorithm}. Use one of {SUPPORTED_HASH_ALGORITHMS}."
+        )
     
-    # Determine columns to hash
+    # Determine columns to hash (already sorted by _resolve_hash_columns)
     cols_to_hash = _resolve_hash_columns(
         all_cols=set(df.columns),
         include_cols=include_cols,
@@ -75,13 +99,24 @@ def add_row_hash(
     if not cols_to_hash:
         raise ValueError("No columns available to hash after include/exclude filters")
     
+    # xxhash64 hashes the typed columns plus their NULL indicators directly
+    if hash_algorithm == "xxhash64":
+        typed_cols = [col(c) for c in cols_to_hash]
+        null_flags = [c.isNull() for c in typed_cols]
+        return df.withColumn(hash_column, xxhash64(*typed_cols, *null_flags))
+
     # Build hash expression
-    # Convert each column to string, handle NULLs, then concatenate
+    # Convert each column to string, handle NULLs, then concatenate.
+    # String columns are used as-is: the cast would be a no-op in the plan.
+    dtypes = dict(df.dtypes)
     string_cols = [
-        coalesce(col(c).cast("string"), lit(null_token)) 
-        for c in sorted(cols_to_hash)
+        coalesce(
+            col(c) if dtypes.get(c) == "string" else col(c).cast("string"),
+            lit(null_token)
+        )
+        for c in cols_to_hash
     ]
-    
+
     concatenated = concat_ws(separator, *string_cols)
     
     # Apply hash
@@ -101,13 +136,18 @@ def add_row_hash_partitioned(
     include_cols: Optional[List[str]] = None,
     exclude_cols: Optional[List[str]] = None,
     null_token: str = "∅",
-    separator: str = "|"
+    separator: str = "|",
+    hash_algorithm: str = "sha256",
+    already_partitioned: bool = False
 ) -> DataFrame:
     """
     Add row hash with optimization for large datasets using partitioning.
     
     This function is optimized for scenarios where you're hashing large tables
     and want to leverage Spark's partitioning for better performance.
+    Pass already_partitioned=True when df is already hash-partitioned on the
+    business keys (e.g. the output of an earlier repartition or join on them)
+    to skip the extra shuffle.
     
     Args:
         df: Input DataFrame
@@ -117,13 +157,19 @@ def add_row_hash_partitioned(
         exclude_cols: Columns to exclude from hash
         null_token: String to represent NULL values
         separator: String to separate column values
+        hash_algorithm: Hash algorithm - "sha256", "md5" or "xxhash64"
+        already_partitioned: Skip the repartition because df is already
+            partitioned on business_keys (default: False)
     
     Returns:
         DataFrame with added hash column
     """
     
     # Repartition by business keys for better locality
-    df_partitioned = df.repartition(*[col(k) for k in business_keys])
+    if already_partitioned:
+        df_partitioned = df
+    else:
+        df_partitioned = df.repartition(*[col(k) for k in business_keys])
     
     # Add hash
     return add_row_hash(
@@ -132,7 +178,8 @@ def add_row_hash_partitioned(
         include_cols=include_cols,
         exclude_cols=exclude_cols,
         null_token=null_token,
-        separator=separator
+        separator=separator,
+        hash_algorithm=hash_algorithm
     )
 
 
@@ -141,7 +188,8 @@ def validate_hash_columns(
     hash_column: str = "row_hash",
     expected_columns: Optional[List[str]] = None,
     max_rows: Optional[int] = None,
-    cache_df: bool = False
+    cache_df: bool = False,
+    mode: Literal["full", "sample"] = "full"
 ) -> bool:
     """
     Validate that hash column exists and has expected properties.
@@ -155,6 +203,9 @@ def validate_hash_columns(
             validation is optional.
         cache_df: Whether to cache the DataFrame within the function before
             running validation. Set to False if caller manages caching.
+        mode: "full" validates every row (or max_rows); "sample" is a quick
+            sanity check on at most HASH_VALIDATION_SAMPLE_ROWS rows, so the
+            limit is pushed into the scan instead of reading the whole table.
 
     Returns:
         True if validation passes
@@ -166,37 +217,47 @@ def validate_hash_columns(
     if hash_column not in df.columns:
         raise ValueError(f"Hash column '{hash_column}' not found in DataFrame")
 
+    if mode not in ("full", "sample"):
+        raise ValueError(f"Unsupported mode: {mode}. Use 'full' or 'sample'.")
+
+    if mode == "sample":
+        max_rows = min(max_rows or HASH_VALIDATION_SAMPLE_ROWS, HASH_VALIDATION_SAMPLE_ROWS)
+
     working_df = df.cache() if cache_df else df
     if max_rows is not None:
         working_df = working_df.limit(max_rows)
 
-    # Check hash column is string type
-    hash_type = dict(df.dtypes)[hash_column]
-    if hash_type != "string":
-        raise ValueError(f"Hash column '{hash_column}' has type '{hash_type}', expected 'string'")
+    # Check hash column is string type (sha256/md5) or bigint (xxhash64)
+    hash_type = df.schema[hash_column].dataType.simpleString()
+    if hash_type not in ("string", "bigint"):
+        raise ValueError(
+            f"Hash column '{hash_column}' has type '{hash_type}', expected 'string' or 'bigint'"
+        )
+
+    # NULL count, row count and a sample hash length in a single job
+    aggs = [
+        spark_sum(col(hash_column).isNull().cast("int")).alias("null_count"),
+        count(lit(1)).alias("row_count"),
+    ]
+    # xxhash64 values are fixed-width longs, no length to check
+    if hash_type == "string":
+        aggs.append(first(length(col(hash_column)), ignorenulls=True).alias("hash_length"))
+
+    stats = working_df.agg(*aggs).collect()[0]
 
     # Check for NULL hashes (shouldn't happen if hash is calculated correctly)
-    null_count = (
-        working_df
-        .agg(spark_sum(col(hash_column).isNull().cast("int")).alias("null_count"))
-        .collect()[0]["null_count"]
-        or 0
-    )
+    null_count = stats["null_count"] or 0
     if null_count > 0:
         raise ValueError(f"Found {null_count} NULL values in hash column '{hash_column}'")
 
-    # Check hash length (SHA256 = 64 chars, MD5 = 32 chars)
-    first_row = working_df.select(hash_column).head(1)
-    if not first_row:
+    if not stats["row_count"]:
         # Kies zelf of je dit ok vindt of juist een error wilt
         raise ValueError("Cannot validate hash length: DataFrame is empty")
 
-    sample_hash = first_row[0][0]
-    #sample_hash = df.select(hash_column).first()[0]
-    
-    if sample_hash:
-        hash_length = len(sample_hash)
-        if hash_length not in (32, 64):
+    # Check hash length (SHA256 = 64 chars, MD5 = 32 chars)
+    if hash_type == "string":
+        hash_length = stats["hash_length"]
+        if hash_length and hash_length not in (32, 64):
             raise ValueError(f"Hash length {hash_length} is unexpected (should be 32 or 64)")
     
     return True
@@ -206,18 +267,30 @@ def compare_hash_differences(
     df1: DataFrame,
     df2: DataFrame,
     business_keys: List[str],
-    hash_column: str = "row_hash"
+    hash_column: str = "row_hash",
+    broadcast_side: Optional[str] = None
 ) -> dict:
     """
     Compare two DataFrames based on business keys and hash values.
     
     Returns statistics about differences (inserts, updates, deletes).
+
+    Spark cannot broadcast either side of a full outer join, so with
+    broadcast_side the small side is broadcast into a left outer join from the
+    large side instead, and the rows missing from the large side are derived
+    as count(small side) - matched rows.
+
+    Each side is reduced to one row per business key first; which row is kept
+    for a duplicated key is arbitrary, so pass de-duplicated input (e.g. from
+    reconstruct_bronze_current_state) when the choice matters.
     
     Args:
         df1: First DataFrame (e.g., Bronze/source)
         df2: Second DataFrame (e.g., Silver/target)
         business_keys: List of business key columns
         hash_column: Name of hash column to compare
+        broadcast_side: "left" to broadcast df1, "right" to broadcast df2,
+            or None for a shuffled full outer join (default: None)
     
     Returns:
         Dictionary with:
@@ -230,40 +303,52 @@ def compare_hash_differences(
     # Validate hash column exists
     if hash_column not in df1.columns or hash_column not in df2.columns:
         raise ValueError(f"Hash column '{hash_column}' must exist in both DataFrames")
+
+    if broadcast_side not in (None, "left", "right"):
+        raise ValueError(f"Unsupported broadcast_side: {broadcast_side}. Use 'left', 'right' or None.")
     
-    # Select only keys + hash
-    df1_subset = df1.select(*business_keys, hash_column).alias("df1")
-    df2_subset = df2.select(*business_keys, hash_column).alias("df2")
+    # Select only keys + hash, one row per business key on each side so
+    # duplicate keys (e.g. un-deduplicated Bronze) cannot fan out the join.
+    # The dedup partitions by the keys, which the join then reuses.
+    df1_subset = df1.select(*business_keys, hash_column).dropDuplicates(business_keys).alias("df1")
+    df2_subset = df2.select(*business_keys, hash_column).dropDuplicates(business_keys).alias("df2")
     
     # Join on business keys
-    joined = df1_subset.join(
-        df2_subset,
-        business_keys,
-        "full_outer"
-    )
+    if broadcast_side == "right":
+        joined = df1_subset.join(broadcast(df2_subset), business_keys, "left_outer")
+    elif broadcast_side == "left":
+        joined = df2_subset.join(broadcast(df1_subset), business_keys, "left_outer")
+    else:
+        joined = df1_subset.join(
+            df2_subset,
+            business_keys,
+            "full_outer"
+        )
     
     # Classify rows
-    classified = joined.withColumn(
-        "change_type",
+    change_type = (
         when(col(f"df2.{hash_column}").isNull(), lit("INSERT"))
         .when(col(f"df1.{hash_column}").isNull(), lit("DELETE"))
         .when(col(f"df1.{hash_column}") != col(f"df2.{hash_column}"), lit("UPDATE"))
         .otherwise(lit("UNCHANGED"))
     )
-    
-    # Count by type
-    counts = classified.groupBy("change_type").count().collect()
-    
-    result = {
-        "inserts": 0,
-        "updates": 0,
-        "deletes": 0,
-        "unchanged": 0
-    }
-    
-    for row in counts:
-        change_type = row["change_type"].lower() + "s"
-        result[change_type] = row["count"]
+
+    # Count by type with conditional sums (one aggregate, no groupBy shuffle)
+    counts = joined.agg(*[
+        spark_sum(when(change_type == lit(kind), 1).otherwise(0)).alias(key)
+        for kind, key in _CHANGE_TYPE_KEYS
+    ]).collect()[0]
+
+    # Sums over an empty join are NULL
+    result = {key: counts[key] or 0 for _, key in _CHANGE_TYPE_KEYS}
+
+    # The left outer join only sees the large side; the small side's
+    # unmatched rows are whatever it has beyond the matched keys
+    matched = result["updates"] + result["unchanged"]
+    if broadcast_side == "right":
+        result["deletes"] = df2_subset.count() - matched
+    elif broadcast_side == "left":
+        result["inserts"] = df1_subset.count() - matched
     
     return result
 
@@ -343,10 +428,7 @@ def add_business_hash(
     
     # Find metadata columns to exclude
     metadata_prefixes = ("_bronze_", "_silver_", "_load_", "_metadata_")
-    exclude = [
-        c for c in df.columns 
-        if any(c.startswith(prefix) for prefix in metadata_prefixes)
-    ]
+    exclude = [c for c in df.columns if c.startswith(metadata_prefixes)]
     
     # Add hash, excluding metadata
     return add_row_hash(
@@ -7,18 +7,43 @@ Provides:
 - Query helpers for log retrieval and analysis
 """
 
+import atexit
 import logging
 import os
 import json
+import queue
+import threading
 from datetime import datetime, date
 from functools import lru_cache
-from logging.handlers import RotatingFileHandler
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 from uuid import uuid4
 from pyspark.sql import DataFrame, SparkSession, Row, functions as F
 
 from modules.constants import CLUSTER_FILES_ROOT
+from modules.delta_utils import invalidate_table_cache
+
+# Module-level logger
+logger = logging.getLogger(__name__)
+
+# Appended by truncate_error_message when a message is cut
+_TRUNC_SUFFIX = "... [TRUNCATED]"
+
+# Shared default formatter for the file and console handlers
+_DEFAULT_FORMATTER = logging.Formatter("%(asctime)s [%(levelname)s] - %(message)s")
+
+# File log buffering: records are written in batches of LOG_BUFFER_CAPACITY,
+# immediately on ERROR, and at least every LOG_FLUSH_INTERVAL_SECONDS
+LOG_BUFFER_CAPACITY = 1024
+LOG_FLUSH_INTERVAL_SECONDS = 30.0
+
+# Stop signal of the running periodic flush thread (None: no thread running)
+_FLUSH_STOP: Optional[threading.Event] = None
+
+# Background thread draining the root logger's QueueHandler into the file handler
+_LOG_LISTENER: Optional[QueueListener] = None
+_listener_atexit_registered = False
 
 
 @lru_cache(maxsize=1)
@@ -52,6 +77,7 @@ def configure_logging(
     enable_console_logging: bool = True,
     log_level: int = logging.INFO,
     formatter: Optional[logging.Formatter] = None,
+    buffer_capacity: int = LOG_BUFFER_CAPACITY,
 ) -> Path:
     """Configure root logging with a rotating file handler.
 
@@ -60,6 +86,14 @@ def configure_logging(
     available, then the cluster path under ``/data/lakehouse`` or a local
     ``notebook_outputs/logs`` directory.
 
+    File output is asynchronous: the root logger gets a ``QueueHandler`` and a
+    background ``QueueListener`` does the file I/O, so callers only enqueue.
+    The listener writes through a ``MemoryHandler`` so records reach the file
+    in batches instead of one stat/write per record; ERROR records, a
+    background flush every ``LOG_FLUSH_INTERVAL_SECONDS`` and interpreter exit
+    (listener stop, then ``logging.shutdown()``) flush the buffer. The console
+    handler stays synchronous so interactive output appears immediately.
+
     Args:
         run_name: Optional name prefix for the log file.
         max_bytes: Maximum log file size before rotation occurs.
@@ -67,18 +101,23 @@ def configure_logging(
         enable_console_logging: Whether to log to stdout in addition to the file.
         log_level: Logging level to apply to the root logger.
         formatter: Optional custom formatter; defaults to timestamp/level/message.
+        buffer_capacity: Records buffered before writing to the file; 0
+            writes every record directly.
 
     Returns:
         Path: Full path to the log file for the current run.
     """
-    formatter = formatter or logging.Formatter("%(asctime)s [%(levelname)s] - %(message)s")
+    formatter = formatter or _DEFAULT_FORMATTER
 
     if getattr(configure_logging, "_configured", False):
-        # Add console logging on demand if it was disabled initially
+        # Add console logging on demand if it was disabled initially; once
+        # installed the flag skips the handler scan on later calls
         root_logger = logging.getLogger()
         root_logger.setLevel(log_level)
-        if enable_console_logging and not _has_console_handler(root_logger):
-            _add_console_handler(root_logger, formatter)
+        if enable_console_logging and not getattr(configure_logging, "_console_installed", False):
+            if not _has_console_handler(root_logger):
+                _add_console_handler(root_logger, formatter)
+            configure_logging._console_installed = True  # type: ignore[attr-defined]
 
         return configure_logging._log_file  # type: ignore[attr-defined]
 
@@ -91,10 +130,12 @@ def configure_logging(
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
 
-    _ensure_file_handler(root_logger, log_file, formatter, max_bytes, backup_count)
+    _ensure_file_handler(root_logger, log_file, formatter, max_bytes, backup_count, buffer_capacity)
 
-    if enable_console_logging and not _has_console_handler(root_logger):
-        _add_console_handler(root_logger, formatter)
+    if enable_console_logging:
+        if not _has_console_handler(root_logger):
+            _add_console_handler(root_logger, formatter)
+        configure_logging._console_installed = True  # type: ignore[attr-defined]
 
     configure_logging._configured = True  # type: ignore[attr-defined]
     configure_logging._log_file = log_file  # type: ignore[attr-defined]
@@ -102,6 +143,18 @@ def configure_logging(
     return log_file
 
 
+def reset_logging() -> None:
+    """Forget configure_logging state so the next call configures from scratch (mainly for testing).
+
+    Handlers already attached to the root logger are left in place.
+    """
+    for attr in ("_configured", "_log_file", "_console_installed"):
+        if hasattr(configure_logging, attr):
+            delattr(configure_logging, attr)
+
+    _stop_periodic_flush()
+
+
 def _has_console_handler(root_logger: logging.Logger) -> bool:
     return any(
         isinstance(handler, logging.StreamHandler)
@@ -122,17 +175,105 @@ def _ensure_file_handler(
     formatter: logging.Formatter,
     max_bytes: int,
     backup_count: int,
+    buffer_capacity: int = LOG_BUFFER_CAPACITY,
 ) -> None:
-    existing_handlers = [h for h in root_logger.handlers if isinstance(h, RotatingFileHandler)]
-    if existing_handlers:
-        existing_handlers[0].setFormatter(formatter)
+    existing = _find_file_handler(root_logger)
+    if existing is not None:
+        existing.setFormatter(formatter)
         return
 
     file_handler = RotatingFileHandler(
         log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
     )
     file_handler.setFormatter(formatter)
-    root_logger.addHandler(file_handler)
+
+    target: logging.Handler = file_handler
+    if buffer_capacity > 0:
+        target = MemoryHandler(
+            capacity=buffer_capacity,
+            flushLevel=logging.ERROR,
+            target=file_handler,
+            flushOnClose=True,
+        )
+
+    # Listener first: starting it stops a previous listener and its flusher
+    _start_queue_listener(root_logger, target)
+
+    if buffer_capacity > 0:
+        _start_periodic_flush(LOG_FLUSH_INTERVAL_SECONDS)
+
+
+def _find_file_handler(root_logger: logging.Logger) -> Optional[RotatingFileHandler]:
+    """Return the rotating file handler behind the root logger, if any."""
+    handlers = list(root_logger.handlers)
+    # File handlers installed by configure_logging hang off the queue listener
+    if _LOG_LISTENER is not None and any(
+        isinstance(h, QueueHandler) and h.queue is _LOG_LISTENER.queue for h in handlers
+    ):
+        handlers.extend(_LOG_LISTENER.handlers)
+
+    for handler in handlers:
+        # A buffered file handler is a MemoryHandler targeting the rotating one
+        target = handler.target if isinstance(handler, MemoryHandler) else handler
+        if isinstance(target, RotatingFileHandler):
+            return target
+    return None
+
+
+def _start_queue_listener(root_logger: logging.Logger, target: logging.Handler) -> None:
+    """Route root logger records through a queue to target on a background thread."""
+    global _LOG_LISTENER, _listener_atexit_registered
+
+    # A previous listener whose QueueHandler was removed from the root logger
+    _stop_queue_listener()
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _LOG_LISTENER = QueueListener(log_queue, target, respect_handler_level=True)
+    _LOG_LISTENER.start()
+    root_logger.addHandler(QueueHandler(log_queue))
+
+    # Registered after logging's own atexit hook, so it runs first and the
+    # queue is drained before logging.shutdown() flushes and closes handlers
+    if not _listener_atexit_registered:
+        atexit.register(_stop_queue_listener)
+        _listener_atexit_registered = True
+
+
+def _stop_queue_listener() -> None:
+    """Drain and stop the background log listener (and its flusher), if running."""
+    global _LOG_LISTENER
+    _stop_periodic_flush()
+    if _LOG_LISTENER is not None:
+        _LOG_LISTENER.stop()
+        _LOG_LISTENER = None
+
+
+def _start_periodic_flush(interval: float) -> None:
+    """Start one daemon thread that flushes the listener's buffered handlers."""
+    global _FLUSH_STOP
+    if _FLUSH_STOP is not None:
+        return
+
+    # One Event per thread, so a restart never revives a stopped loop
+    stop = threading.Event()
+
+    def _flush_loop() -> None:
+        while not stop.wait(interval):
+            listener = _LOG_LISTENER
+            for handler in (listener.handlers if listener else ()):
+                if isinstance(handler, MemoryHandler):
+                    handler.flush()
+
+    threading.Thread(target=_flush_loop, name="log-buffer-flush", daemon=True).start()
+    _FLUSH_STOP = stop
+
+
+def _stop_periodic_flush() -> None:
+    """Signal the periodic flush thread to exit, if one is running."""
+    global _FLUSH_STOP
+    if _FLUSH_STOP is not None:
+        _FLUSH_STOP.set()
+        _FLUSH_STOP = None
 
 
 # =============================================================================
@@ -187,8 +328,6 @@ def ensure_log_tables(spark: SparkSession, debug: bool = False) -> None:
         silver_run_summary_schema
     )
 
-    logger = logging.getLogger(__name__)
-
     # Create logs schema if it doesn't exist
     try:
         spark.sql(f"CREATE SCHEMA IF NOT EXISTS {LOG_SCHEMA}")
@@ -248,6 +387,7 @@ def ensure_log_tables(spark: SparkSession, debug: bool = False) -> None:
                 writer = writer.partitionBy(*partition_by)
 
             writer.saveAsTable(table_name)
+            invalidate_table_cache(table_name)
 
             logger.info(f"✓ Created {description} table: {table_name}")
 
@@ -259,11 +399,13 @@ def ensure_log_tables(spark: SparkSession, debug: bool = False) -> None:
     _log_tables_initialized = True
 
 
+@lru_cache(maxsize=64)
 def build_run_date(run_ts: str) -> date:
     """
     Convert a run_ts like '20251005T142752505' into a Python date(2025, 10, 5).
 
-    This avoids Spark date parsing issues with ANSI mode.
+    This avoids Spark date parsing issues with ANSI mode. Memoized: a run has
+    one run_ts but calls this for every log record and query filter.
 
     Args:
         run_ts: Run timestamp in yyyymmddThhmmss format
@@ -284,6 +426,17 @@ def build_run_date(run_ts: str) -> date:
     return date(y, m, d)
 
 
+def _run_ts_filter(run_ts: str):
+    """
+    Filter log rows on run_ts plus its run_date partition.
+
+    run_date is always derived from run_ts (build_run_date), so the extra
+    predicate does not change the result but lets Delta prune to a single
+    run_date partition instead of checking run_ts stats in every file.
+    """
+    return (F.col("run_date") == F.lit(build_run_date(run_ts))) & (F.col("run_ts") == run_ts)
+
+
 def truncate_error_message(error_msg: Optional[str], max_length: int = 1000) -> Optional[str]:
     """
     Truncate error messages to prevent bloating log tables.
@@ -307,7 +460,7 @@ def truncate_error_message(error_msg: Optional[str], max_length: int = 1000) ->
     if len(error_msg) <= max_length:
         return error_msg
 
-    return error_msg[:max_length] + "... [TRUNCATED]"
+    return f"{error_msg[:max_length]}{_TRUNC_SUFFIX}"
 
 
 def get_bronze_logs_for_run(spark: SparkSession, run_ts: str) -> DataFrame:
@@ -325,7 +478,7 @@ def get_bronze_logs_for_run(spark: SparkSession, run_ts: str) -> DataFrame:
         >>> logs = get_bronze_logs_for_run(spark, "20251105T142752505")
         >>> logs.show()
     """
-    return spark.table(BRONZE_LOG_TABLE).where(F.col("run_ts") == run_ts)
+    return spark.table(BRONZE_LOG_TABLE).where(_run_ts_filter(run_ts))
 
 
 def get_silver_logs_for_run(spark: SparkSession, run_ts: str) -> DataFrame:
@@ -343,7 +496,103 @@ def get_silver_logs_for_run(spark: SparkSession, run_ts: str) -> DataFrame:
         >>> logs = get_silver_logs_for_run(spark, "20251105T142752505")
         >>> logs.show()
     """
-    return spark.table(SILVER_LOG_TABLE).where(F.col("run_ts") == run_ts)
+    return spark.table(SILVER_LOG_TABLE).where(_run_ts_filter(run_ts))
+
+
+# Narrow cached log views per (layer, run_ts), see cache_run_view()
+_RUN_VIEW_CACHE: Dict[tuple, DataFrame] = {}
+
+
+def cache_run_view(spark: SparkSession, run_ts: str, layer: str = "bronze") -> DataFrame:
+    """
+    Cache the (table_name, status, run_ts) log rows of a run in memory.
+
+    Opt-in, for notebooks that query a finished run repeatedly (reports,
+    retry planning): get_run_table_statuses, get_failed_tables,
+    get_successful_tables and is_table_processed then filter Spark's
+    in-memory columnar cache instead of re-scanning the Delta partition.
+    Not done automatically, because during a run other notebooks keep
+    appending to the log table and a cached view would go stale; log_batch
+    drops the cached views of the layer it writes to.
+
+    Args:
+        spark: Active SparkSession
+        run_ts: Run timestamp
+        layer: "bronze" or "silver"
+
+    Returns:
+        The cached, materialized DataFrame
+    """
+    key = (layer, run_ts)
+    cached = _RUN_VIEW_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    table = BRONZE_LOG_TABLE if layer == "bronze" else SILVER_LOG_TABLE
+    view = spark.table(table) \
+        .where(_run_ts_filter(run_ts)) \
+        .select("table_name", "status", "run_ts") \
+        .cache()
+    view.count()  # materialize once
+
+    _RUN_VIEW_CACHE[key] = view
+    return view
+
+
+def uncache_run_view(run_ts: Optional[str] = None, layer: Optional[str] = None) -> None:
+    """
+    Unpersist cached run views (all of them, or those matching run_ts/layer).
+
+    Args:
+        run_ts: Only drop views for this run timestamp
+        layer: Only drop views for this layer
+    """
+    for key in list(_RUN_VIEW_CACHE):
+        key_layer, key_run_ts = key
+        if (layer is None or key_layer == layer) and (run_ts is None or key_run_ts == run_ts):
+            _RUN_VIEW_CACHE.pop(key).unpersist()
+
+
+def _run_view(spark: SparkSession, run_ts: str, layer: str) -> DataFrame:
+    """Return the cached run view if one exists, else the filtered log table."""
+    cached = _RUN_VIEW_CACHE.get((layer, run_ts))
+    if cached is not None:
+        return cached
+
+    table = BRONZE_LOG_TABLE if layer == "bronze" else SILVER_LOG_TABLE
+    return spark.table(table).where(_run_ts_filter(run_ts))
+
+
+def get_run_table_statuses(spark: SparkSession, run_ts: str, layer: str = "bronze") -> Dict[str, List[str]]:
+    """
+    Get the table names per status for a run_ts in a single scan.
+
+    Use this instead of calling get_failed_tables and get_successful_tables
+    back to back: one Delta scan and one collected row. The (status, table)
+    pairs are gathered with a global collect_set, i.e. partial sets per
+    partition merged in a final aggregate, instead of a hash-distinct
+    shuffle plus one Row per pair. Served from memory after cache_run_view().
+
+    Args:
+        spark: Active SparkSession
+        run_ts: Run timestamp
+        layer: "bronze" or "silver"
+
+    Returns:
+        Dict mapping status (e.g. 'SUCCESS', 'FAILED') to table names
+
+    Example:
+        >>> statuses = get_run_table_statuses(spark, "20251105T142752505", "bronze")
+        >>> print(f"Failed tables: {statuses.get('FAILED', [])}")
+    """
+    result = _run_view(spark, run_ts, layer) \
+        .agg(F.collect_set(F.struct("status", "table_name")).alias("pairs")) \
+        .first()
+
+    statuses: Dict[str, List[str]] = {}
+    for status, table_name in (result["pairs"] if result and result["pairs"] else []):
+        statuses.setdefault(status, []).append(table_name)
+    return statuses
 
 
 def get_failed_tables(spark: SparkSession, run_ts: str, layer: str = "bronze") -> List[str]:
@@ -362,15 +611,7 @@ def get_failed_tables(spark: SparkSession, run_ts: str, layer: str = "bronze") -
         >>> failed = get_failed_tables(spark, "20251105T142752505", "bronze")
         >>> print(f"Failed tables: {failed}")
     """
-    table = BRONZE_LOG_TABLE if layer == "bronze" else SILVER_LOG_TABLE
-
-    failed = spark.table(table) \
-        .where(f"run_ts = '{run_ts}' AND status = 'FAILED'") \
-        .select("table_name") \
-        .distinct() \
-        .collect()
-
-    return [row.table_name for row in failed]
+    return get_run_table_statuses(spark, run_ts, layer).get("FAILED", [])
 
 
 def get_successful_tables(spark: SparkSession, run_ts: str, layer: str = "bronze") -> List[str]:
@@ -389,15 +630,7 @@ def get_successful_tables(spark: SparkSession, run_ts: str, layer: str = "bronze
         >>> success = get_successful_tables(spark, "20251105T142752505", "bronze")
         >>> print(f"Successful tables: {len(success)}")
     """
-    table = BRONZE_LOG_TABLE if layer == "bronze" else SILVER_LOG_TABLE
-
-    success = spark.table(table) \
-        .where(f"run_ts = '{run_ts}' AND status = 'SUCCESS'") \
-        .select("table_name") \
-        .distinct() \
-        .collect()
-
-    return [row.table_name for row in success]
+    return get_run_table_statuses(spark, run_ts, layer).get("SUCCESS", [])
 
 
 def is_table_processed(spark: SparkSession, run_ts: str, table_name: str, layer: str = "bronze") -> bool:
@@ -417,13 +650,17 @@ def is_table_processed(spark: SparkSession, run_ts: str, table_name: str, layer:
         >>> if is_table_processed(spark, "20251105T142752505", "Dim_Relatie"):
         ...     print("Table was processed successfully")
     """
-    table = BRONZE_LOG_TABLE if layer == "bronze" else SILVER_LOG_TABLE
-
-    count = spark.table(table) \
-        .where(f"run_ts = '{run_ts}' AND table_name = '{table_name}' AND status = 'SUCCESS'") \
-        .count()
+    # Column literals keep the filter pushable for partition pruning, and
+    # limit(1) stops the scan at the first match instead of counting them all
+    rows = _run_view(spark, run_ts, layer) \
+        .where(
+            (F.col("table_name") == table_name)
+            & (F.col("status") == "SUCCESS")
+        ) \
+        .limit(1) \
+        .take(1)
 
-    return count > 0
+    return len(rows) > 0
 
 
 def get_latest_run_summary(spark: SparkSession, source: str, layer: str = "bronze") -> Optional[Dict[str, Any]]:
@@ -446,7 +683,7 @@ def get_latest_run_summary(spark: SparkSession, source: str, layer: str = "bronz
     table = BRONZE_SUMMARY_TABLE if layer == "bronze" else SILVER_SUMMARY_TABLE
 
     latest = spark.table(table) \
-        .where(f"source = '{source}'") \
+        .where(F.col("source") == source) \
         .orderBy(F.col("run_ts").desc()) \
         .limit(1) \
         .collect()
@@ -476,7 +713,9 @@ def _prepare_bronze_rows(bronze_results: List[Dict[str, Any]], run_log_id: str):
     for r in bronze_results:
         log_id = r.get("log_id") or f"{run_log_id}_{uuid4().hex[:8]}"
         partition_key = r.get("partition_key") or r.get("run_ts")
-        error_msg = truncate_error_message(r.get("error_message"))
+        # Successful records have no error: skip the call entirely
+        raw_error = r.get("error_message")
+        error_msg = truncate_error_message(raw_error) if raw_error else None
 
         rows.append(
             (
@@ -510,7 +749,7 @@ def _prepare_silver_rows(records: List[Dict[str, Any]]):
         records: List of Silver processing results
 
     Returns:
-        List of Rows ready for DataFrame creation
+        List of tuples ready for DataFrame creation
     """
     rows = []
     for r in records:
@@ -522,30 +761,36 @@ def _prepare_silver_rows(records: List[Dict[str, Any]]):
         if run_date is None:
             run_date = build_run_date(run_ts)
 
-        error_msg = truncate_error_message(r.get("error_message"))
-
-        rows.append(Row(
-            log_id           = r.get("log_id"),
-            run_id           = r.get("run_id"),
-            run_date         = run_date,
-            run_ts           = run_ts,
-            source           = r.get("source"),
-            table_name       = r.get("table_name"),
-            load_mode        = r.get("load_mode"),
-            status           = r.get("status"),
-            rows_inserted    = r.get("rows_inserted"),
-            rows_updated     = r.get("rows_updated"),
-            rows_deleted     = r.get("rows_deleted"),
-            rows_unchanged   = r.get("rows_unchanged"),
-            total_silver_rows= r.get("total_silver_rows"),
-            bronze_rows      = r.get("bronze_rows"),
-            bronze_table     = r.get("bronze_table"),
-            start_time       = r.get("start_time"),
-            end_time         = r.get("end_time"),
-            duration_seconds = r.get("duration_seconds"),
-            error_message    = error_msg,
-            silver_table     = r.get("silver_table"),
-        ))
+        # Successful records have no error: skip the call entirely
+        raw_error = r.get("error_message")
+        error_msg = truncate_error_message(raw_error) if raw_error else None
+
+        # Plain tuples in silver_processing_log_schema order: no per-row
+        # Row construction, same positional mapping as the Bronze rows
+        rows.append(
+            (
+                r.get("log_id"),
+                r.get("run_id"),
+                run_date,
+                run_ts,
+                r.get("source"),
+                r.get("table_name"),
+                r.get("load_mode"),
+                r.get("status"),
+                r.get("rows_inserted"),
+                r.get("rows_updated"),
+                r.get("rows_deleted"),
+                r.get("rows_unchanged"),
+                r.get("total_silver_rows"),
+                r.get("bronze_rows"),
+                r.get("bronze_table"),
+                r.get("start_time"),
+                r.get("end_time"),
+                r.get("duration_seconds"),
+                error_msg,
+                r.get("silver_table"),
+            )
+        )
     return rows
 
 
@@ -611,7 +856,9 @@ def log_batch(
         .mode("append")
         .saveAsTable(table))
 
-    logger = logging.getLogger(__name__)
+    # Cached run views of this layer no longer reflect the table
+    uncache_run_view(layer=layer)
+
     logger.info(f"✓ Logged {len(records)} {layer.capitalize()} records to {table}")
 
 
@@ -736,6 +983,82 @@ def log_summary(
         .mode("append")
         .saveAsTable(table))
 
-    logger = logging.getLogger(__name__)
     logger.info(f"✓ Logged {layer.capitalize()} summary to {table}")
-    return log_id
\ No newline at end of file
+    return log_id
+
+
+# Log table Z-ORDER columns (partition columns can't be Z-ordered, so the
+# Bronze log, partitioned by run_date/table_name, only clusters on run_ts)
+LOG_TABLE_ZORDER_COLUMNS = {
+    BRONZE_LOG_TABLE: ["run_ts"],
+    SILVER_LOG_TABLE: ["run_ts", "table_name"],
+    BRONZE_SUMMARY_TABLE: ["source", "run_ts"],
+    SILVER_SUMMARY_TABLE: ["source", "run_ts"],
+}
+
+# Only OPTIMIZE a log table once this many files were added since the last OPTIMIZE
+LOG_OPTIMIZE_MIN_FILES = 32
+
+
+def _files_added_since_optimize(spark: SparkSession, table: str, limit: int) -> int:
+    """
+    Count data files added to a table since its last OPTIMIZE, from DESCRIBE HISTORY.
+
+    Reads at most `limit` commits (newest first): every commit adds at least
+    one file, so reaching the limit already means `limit` new files.
+    """
+    history = spark.sql(f"DESCRIBE HISTORY {table} LIMIT {int(limit)}") \
+        .select("operation", "operationMetrics") \
+        .collect()
+
+    added = 0
+    for row in history:
+        if row["operation"] == "OPTIMIZE":
+            break
+        metrics = row["operationMetrics"] or {}
+        added += int(metrics.get("numFiles") or metrics.get("numAddedFiles") or 1)
+    return added
+
+
+def maintain_log_tables(
+    spark: SparkSession,
+    min_files: int = LOG_OPTIMIZE_MIN_FILES
+) -> Dict[str, bool]:
+    """
+    Compact and Z-ORDER the log tables so run_ts/table_name lookups can skip files.
+
+    Meant to be called once at the end of a run. Every log_batch/log_summary
+    append adds at least one small file; OPTIMIZE only runs for tables that
+    had min_files added since their last OPTIMIZE, so the cost is amortized
+    over many runs. The count comes from the latest DESCRIBE HISTORY entries
+    (Delta log metadata, no data scan). Failures are logged, not raised:
+    maintenance must not fail a run.
+
+    Args:
+        spark: Active SparkSession
+        min_files: Files added since the last OPTIMIZE before a table is optimized again
+
+    Returns:
+        Dict mapping table name -> True if it was optimized
+
+    Example:
+        >>> maintain_log_tables(spark)
+        {'logs.bronze_processing_log': True, 'logs.silver_processing_log': False, ...}
+    """
+    optimized: Dict[str, bool] = {}
+
+    for table, zorder_cols in LOG_TABLE_ZORDER_COLUMNS.items():
+        optimized[table] = False
+        try:
+            new_files = _files_added_since_optimize(spark, table, min_files)
+            if new_files < min_files:
+                logger.debug(f"Skipping OPTIMIZE of {table}: {new_files} new files < {min_files}")
+                continue
+
+            spark.sql(f"OPTIMIZE {table} ZORDER BY ({', '.join(zorder_cols)})")
+            optimized[table] = True
+            logger.info(f"✓ Optimized {table} ({new_files} new files) with ZORDER BY {zorder_cols}")
+        except Exception as e:
+            logger.warning(f"Could not optimize log table {table}: {e}")
+
+    return optimized
@@ -5,19 +5,26 @@ Provides functions for generating DAG configurations from SQL Server metadata.
 """
 
 import re
-from typing import Any
+from functools import lru_cache
+from typing import Any, Sequence
 from pyspark.sql import DataFrame, SparkSession, functions as F, types as T
 import logging
 
 logger = logging.getLogger(__name__)
 
+# make_safe_identifier patterns, compiled once
+_UNSAFE_CHARS_RE = re.compile(r"[^0-9A-Za-z_ ]+")
+_WHITESPACE_RE = re.compile(r"\s+")
 
+
+@lru_cache(maxsize=8192)
 def make_safe_identifier(name: str) -> str:
     """
     Normalize column names for Delta Lake compatibility.
 
     Removes special characters, converts spaces to underscores,
-    ensures valid identifier format.
+    ensures valid identifier format. Memoized: the same column names recur
+    across tables and runs.
 
     Args:
         name: Original column name
@@ -34,11 +41,15 @@ def make_safe_identifier(name: str) -> str:
     if name is None:
         return ""
 
+    # Fast path: ASCII identifiers ([A-Za-z_][A-Za-z0-9_]*) are already safe
+    if name.isascii() and name.isidentifier():
+        return name
+
     # Remove special characters (keep only alphanumeric, underscore, space)
-    cleaned = re.sub(r"[^0-9A-Za-z_ ]+", "", name)
+    cleaned = _UNSAFE_CHARS_RE.sub("", name)
 
     # Replace spaces with underscores
-    cleaned = re.sub(r"\s+", "_", cleaned.strip())
+    cleaned = _WHITESPACE_RE.sub("_", cleaned.strip())
 
     # Ensure doesn't start with digit
     if cleaned and cleaned[0].isdigit():
@@ -47,6 +58,37 @@ def make_safe_identifier(name: str) -> str:
     return cleaned or name
 
 
+# SQL Server type -> extraction expression template ({col} is the [column]
+# reference); one dict lookup per column instead of an if/elif chain.
+# decimal/numeric are handled in column_expression (they need precision/scale),
+# char/varchar/nchar/nvarchar and unknown types pass through unchanged.
+_TYPE_TEMPLATES = {
+    # Money types
+    "money":            "CAST({col} AS decimal(19,4))",
+    "smallmoney":       "CAST({col} AS decimal(10,4))",
+
+    # Integer types
+    "tinyint":          "CAST({col} AS smallint)",
+    **{dt: f"CAST({{col}} AS {dt})" for dt in ("smallint", "int", "bigint", "bit", "float", "real")},
+
+    # Date/Time types
+    "date":             "CAST({col} AS date)",
+    "datetime":         "CAST({col} AS datetime2(3))",
+    "smalldatetime":    "CAST({col} AS datetime2(0))",
+    "datetime2":        "CAST({col} AS datetime2(6))",
+    "time":             "CONVERT(varchar(8), {col}, 108)",
+    "datetimeoffset":   "CAST(SWITCHOFFSET({col}, '+00:00') AS datetime2(6))",
+
+    # String types
+    "text":             "CONVERT(varchar(max), {col})",
+    "ntext":            "CONVERT(nvarchar(max), {col})",
+
+    # Special types
+    "uniqueidentifier": "CONVERT(varchar(36), {col})",
+    "xml":              "CONVERT(nvarchar(max), {col})",
+}
+
+
 def column_expression(col: T.Row) -> str:
     """
     Build SQL column expression with proper type casting for SQL Server data types.
@@ -72,55 +114,15 @@ def column_expression(col: T.Row) -> str:
     dt = (col.data_type or "").lower()
     col_ref = f"[{col.column_name}]"
 
-    # Decimal/Numeric types
+    # Decimal/Numeric types carry their own precision/scale
     if dt in ("decimal", "numeric"):
         precision = col.numeric_precision or 0
         scale = col.numeric_scale or 0
         expr = f"CAST({col_ref} AS decimal({precision},{scale}))"
-
-    # Money types
-    elif dt == "money":
-        expr = f"CAST({col_ref} AS decimal(19,4))"
-    elif dt == "smallmoney":
-        expr = f"CAST({col_ref} AS decimal(10,4))"
-
-    # Integer types
-    elif dt == "tinyint":
-        expr = f"CAST({col_ref} AS smallint)"
-    elif dt in {"smallint", "int", "bigint", "bit", "float", "real"}:
-        expr = f"CAST({col_ref} AS {dt})"
-
-    # Date/Time types
-    elif dt == "date":
-        expr = f"CAST({col_ref} AS date)"
-    elif dt == "datetime":
-        expr = f"CAST({col_ref} AS datetime2(3))"
-    elif dt == "smalldatetime":
-        expr = f"CAST({col_ref} AS datetime2(0))"
-    elif dt == "datetime2":
-        expr = f"CAST({col_ref} AS datetime2(6))"
-    elif dt == "time":
-        expr = f"CONVERT(varchar(8), {col_ref}, 108)"
-    elif dt == "datetimeoffset":
-        expr = f"CAST(SWITCHOFFSET({col_ref}, '+00:00') AS datetime2(6))"
-
-    # String types
-    elif dt in {"char", "varchar", "nchar", "nvarchar"}:
-        expr = col_ref
-    elif dt == "text":
-        expr = f"CONVERT(varchar(max), {col_ref})"
-    elif dt == "ntext":
-        expr = f"CONVERT(nvarchar(max), {col_ref})"
-
-    # Special types
-    elif dt == "uniqueidentifier":
-        expr = f"CONVERT(varchar(36), {col_ref})"
-    elif dt == "xml":
-        expr = f"CONVERT(nvarchar(max), {col_ref})"
-
-    # Unknown types - pass through
     else:
-        expr = col_ref
+        # Unknown types (and plain strings) pass through
+        template = _TYPE_TEMPLATES.get(dt)
+        expr = template.format(col=col_ref) if template else col_ref
 
     # Add alias with safe name
     alias = make_safe_identifier(col.column_name)
@@ -155,6 +157,82 @@ def build_base_query(schema_name: str, table_name: str, columns: list) -> str:
     return f"SELECT {select_clause} FROM [{schema_name}].[{table_name}]"
 
 
+def _safe_identifier_column(name: Any) -> Any:
+    """Spark column equivalent of make_safe_identifier for a column-name column."""
+    cleaned = F.trim(F.regexp_replace(name, _UNSAFE_CHARS_RE.pattern, ""))
+    cleaned = F.regexp_replace(cleaned, _WHITESPACE_RE.pattern, "_")
+    cleaned = F.when(cleaned.rlike("^[0-9]"), F.concat(F.lit("_"), cleaned)).otherwise(cleaned)
+    return F.when(cleaned == "", name).otherwise(cleaned)
+
+
+def _column_expression_column() -> Any:
+    """Spark column equivalent of column_expression over metadata rows."""
+    dt = F.lower(F.coalesce(F.col("data_type"), F.lit("")))
+    col_ref = F.concat(F.lit("["), F.col("column_name"), F.lit("]"))
+
+    expr = F.when(
+        dt.isin("decimal", "numeric"),
+        F.concat(
+            F.lit("CAST("), col_ref, F.lit(" AS decimal("),
+            F.coalesce(F.col("numeric_precision"), F.lit(0)).cast("string"), F.lit(","),
+            F.coalesce(F.col("numeric_scale"), F.lit(0)).cast("string"), F.lit("))"),
+        ),
+    )
+    # Same templates as column_expression, split around the column reference
+    for type_name, template in _TYPE_TEMPLATES.items():
+        prefix, suffix = template.split("{col}")
+        expr = expr.when(dt == type_name, F.concat(F.lit(prefix), col_ref, F.lit(suffix)))
+    expr = expr.otherwise(col_ref)
+
+    return F.concat(expr, F.lit(" AS ["), _safe_identifier_column(F.col("column_name")), F.lit("]"))
+
+
+def build_base_queries(
+    df: DataFrame,
+    schema_col: str = "schema_name",
+    table_col: str = "obj_name",
+    extra_group_cols: Sequence[str] = ()
+) -> DataFrame:
+    """
+    Build the SELECT query of every table in a metadata DataFrame in one Spark job.
+
+    Produces the same queries as build_base_query, but the per-column casts,
+    safe aliases and ordering are Spark expressions, so no metadata Rows are
+    shipped to Python (no RDD map / Python workers).
+
+    Args:
+        df: Metadata with column_name, data_type, numeric_precision,
+            numeric_scale, ordinal_position and the schema/table columns
+        schema_col: Column holding the SQL Server schema name
+        table_col: Column holding the SQL Server table name
+        extra_group_cols: Additional grouping columns to keep (e.g. ["Bron"])
+
+    Returns:
+        DataFrame with extra_group_cols, schema_col, table_col and base_query
+
+    Example:
+        >>> base_query_df = build_base_queries(metadata_df, extra_group_cols=["Bron"])
+    """
+    group_cols = [*extra_group_cols, schema_col, table_col]
+
+    # Sort by ordinal position to maintain column order
+    ordered = F.array_sort(F.collect_list(F.struct(
+        F.coalesce(F.col("ordinal_position"), F.lit(0)).alias("pos"),
+        _column_expression_column().alias("expr"),
+    )))
+
+    return df \
+        .groupBy(*group_cols) \
+        .agg(F.concat_ws(",", F.transform(ordered, lambda c: c["expr"])).alias("select_clause")) \
+        .select(
+            *group_cols,
+            F.concat(
+                F.lit("SELECT "), F.col("select_clause"),
+                F.lit(" FROM ["), F.col(schema_col), F.lit("].["), F.col(table_col), F.lit("]"),
+            ).alias("base_query"),
+        )
+
+
 def load_metadata(spark: SparkSession, path: str) -> DataFrame:
     """
     Load SQL Server metadata from parquet file.
@@ -173,7 +251,7 @@ def load_metadata(spark: SparkSession, path: str) -> DataFrame:
     return spark.read.parquet(path).filter(F.col("obj_name").isNotNull())
 
 
-def validate_metadata(df: DataFrame) -> DataFrame:
+def validate_metadata(df: DataFrame, skip_validation: bool = False) -> DataFrame:
     """
     Validate metadata DataFrame has required columns and no nulls.
 
@@ -183,6 +261,8 @@ def validate_metadata(df: DataFrame) -> DataFrame:
 
     Args:
         df: Metadata DataFrame to validate
+        skip_validation: Only check column presence (no Spark action), for
+            pipelines that already trust the metadata export
 
     Returns:
         Validated DataFrame (same as input if valid)
@@ -200,9 +280,14 @@ def validate_metadata(df: DataFrame) -> DataFrame:
     if missing:
         raise ValueError(f"Required columns are missing: {', '.join(missing)}")
 
+    if skip_validation:
+        return df
+
     # Check for nulls in ONE query instead of multiple count() calls
+    # (count skips the NULLs of when() without an otherwise, and is 0, not
+    # NULL, on an empty DataFrame)
     null_checks = [
-        F.sum(F.when(F.col(c).isNull(), 1).otherwise(0)).alias(f"{c}_nulls")
+        F.count(F.when(F.col(c).isNull(), True)).alias(f"{c}_nulls")
         for c in required_cols
     ]
 
@@ -5,21 +5,67 @@ Nabootst Microsoft Fabric's mssparkutils functionaliteit voor vanilla Spark clus
 - notebook.run() via Papermill
 - fs.* file system operations via pathlib
 """
+import atexit
 import json
 import logging
+import os
 import shutil
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any, Union, List
+from typing import Optional, Dict, Any, Union, List, Iterator
 
 import papermill as pm
 
 from modules.logging_utils import configure_logging
+from modules.path_utils import resolve_files_path
 
 logger = logging.getLogger(__name__)
 
+# Hergebruikte kernels per kernel_name (NotebookRunner.run(reuse_kernel=True))
+_KERNEL_POOL: Dict[str, Any] = {}
+
+
+def _get_pooled_kernel(kernel_name: str) -> Any:
+    """
+    Geef een kernel manager uit de pool terug (lazy aangemaakt).
+
+    Papermill/nbclient starten de kernel bij de eerste run en laten hem
+    draaien omdat ze de manager niet zelf bezitten; een gecrashte kernel
+    wordt vervangen. Bij afsluiten van de interpreter worden alle kernels
+    gestopt.
+    """
+    from jupyter_client.manager import AsyncKernelManager
+    from jupyter_core.utils import run_sync
+
+    km = _KERNEL_POOL.get(kernel_name)
+    if km is not None and km.has_kernel and not run_sync(km.is_alive)():
+        logger.warning("Pooled kernel '%s' is niet meer actief, nieuwe kernel wordt gestart", kernel_name)
+        run_sync(km.cleanup_resources)()
+        km = None
+
+    if km is None:
+        if not _KERNEL_POOL:
+            atexit.register(_shutdown_kernel_pool)
+        km = AsyncKernelManager(kernel_name=kernel_name)
+        _KERNEL_POOL[kernel_name] = km
+    return km
+
+
+def _shutdown_kernel_pool() -> None:
+    """Stop alle kernels in de pool."""
+    from jupyter_core.utils import run_sync
+
+    while _KERNEL_POOL:
+        _, km = _KERNEL_POOL.popitem()
+        try:
+            if km.has_kernel:
+                run_sync(km.shutdown_kernel)(now=True)
+        except Exception as e:
+            logger.debug("Kon pooled kernel niet stoppen: %s", e)
+
 
 class NotebookRunner:
     """
@@ -33,15 +79,24 @@ class NotebookRunner:
         timeout_seconds: int = 3600,
         arguments: Optional[Dict[str, Any]] = None,
         output_dir: Optional[Union[str, Path]] = None,
+        reuse_kernel: bool = False,
     ) -> str:
         """
         Voer een notebook uit met parameters (zoals Fabric mssparkutils.notebook.run)
 
+        Standaard start Papermill per run een verse kernel (1-3 s opstarttijd,
+        plus een nieuwe SparkSession). Met reuse_kernel=True draaien opeenvolgende
+        runs in dezelfde kernel uit een pool, inclusief de actieve SparkSession.
+        Let op: de notebooks delen dan ook globals en geïmporteerde modules, dus
+        alleen gebruiken voor notebooks die geen state van een vorige run kunnen
+        oppikken.
+
         Args:
             notebook_path: Pad naar notebook (relatief of absoluut, met of zonder .ipynb)
             timeout_seconds: Timeout in seconden
             arguments: Dictionary met parameters voor notebook
             output_dir: Optioneel pad om notebook outputs in te schrijven (voor tests/CI)
+            reuse_kernel: Hergebruik een kernel uit de pool i.p.v. een nieuwe te starten
             
         Returns:
             JSON string met resultaat (compatible met Fabric format)
@@ -95,6 +150,10 @@ class NotebookRunner:
         logger.info("-" * 70)
         
         try:
+            # Papermill geeft km door aan nbclient, dat een kernel die het niet
+            # zelf heeft aangemaakt na afloop laat draaien
+            engine_kwargs = {"km": _get_pooled_kernel('python3')} if reuse_kernel else {}
+
             # Voer notebook uit met Papermill
             pm.execute_notebook(
                 str(notebook_path_obj),
@@ -102,7 +161,8 @@ class NotebookRunner:
                 parameters=arguments or {},
                 kernel_name='python3',
                 timeout=timeout_seconds,
-                progress_bar=True
+                progress_bar=True,
+                **engine_kwargs
             )
             
             logger.info("-" * 70)
@@ -165,30 +225,36 @@ class MockFileSystem:
             spark: Optional SparkSession for path resolution
         """
         self.spark = spark
+        self._path_cache: Dict[str, Path] = {}
 
     def _resolve_path(self, path: str) -> Path:
         """
         Resolve Fabric-style path to absolute local path.
 
+        Results are cached per instance; the environment (and thus the
+        Files root) does not change for the lifetime of a SparkSession.
+
         Args:
             path: Fabric-style path (e.g., "Files/config/foo.json")
 
         Returns:
             Path: Absolute local path
         """
-        # Import here to avoid circular dependency
-        from modules.path_utils import resolve_files_path
+        cached = self._path_cache.get(path)
+        if cached is not None:
+            return cached
 
-        resolved = resolve_files_path(path, self.spark)
-        return Path(resolved)
+        resolved = Path(resolve_files_path(path, self.spark))
+        self._path_cache[path] = resolved
+        return resolved
 
-    def put(self, path: str, content: str, overwrite: bool = False) -> None:
+    def put(self, path: str, content: Union[str, bytes], overwrite: bool = False) -> None:
         """
         Write content to a file.
 
         Args:
             path: File path (Fabric-style, e.g., "Files/config/foo.json")
-            content: String content to write
+            content: String content to write; bytes are written as-is
             overwrite: If True, overwrite existing file; if False, raise error if exists
 
         Raises:
@@ -206,19 +272,36 @@ class MockFileSystem:
         # Create parent directories if they don't exist
         file_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Write content
-        file_path.write_text(content, encoding='utf-8')
+        # Write content (bytes skip the encode step)
+        if isinstance(content, bytes):
+            file_path.write_bytes(content)
+        else:
+            file_path.write_text(content, encoding='utf-8')
         logger.debug(f"fs.put: Wrote {len(content)} bytes to {file_path}")
 
-    def read(self, path: str) -> str:
+    def _resolve_file(self, path: str) -> Path:
+        """Resolve path and ensure it points to an existing file."""
+        file_path = self._resolve_path(path)
+
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        if not file_path.is_file():
+            raise IsADirectoryError(f"Path is a directory, not a file: {file_path}")
+
+        return file_path
+
+    def read(self, path: str, binary: bool = False) -> Union[str, bytes]:
         """
         Read content from a file.
 
         Args:
             path: File path (Fabric-style)
+            binary: If True, return raw bytes without decoding
+                (e.g. for json.loads, which accepts bytes directly)
 
         Returns:
-            str: File content
+            str: File content (bytes when binary=True)
 
         Raises:
             FileNotFoundError: If file does not exist
@@ -226,18 +309,36 @@ class MockFileSystem:
         Example:
             content = mssparkutils.fs.read("Files/config/metadata.json")
         """
-        file_path = self._resolve_path(path)
+        file_path = self._resolve_file(path)
 
-        if not file_path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
-
-        if not file_path.is_file():
-            raise IsADirectoryError(f"Path is a directory, not a file: {file_path}")
-
-        content = file_path.read_text(encoding='utf-8')
+        content = file_path.read_bytes() if binary else file_path.read_text(encoding='utf-8')
         logger.debug(f"fs.read: Read {len(content)} bytes from {file_path}")
         return content
 
+    def iter_lines(self, path: str) -> Iterator[str]:
+        """
+        Stream a text file line by line without loading it fully in memory.
+
+        Not part of mssparkutils.fs; intended for local JSONL/large config files.
+
+        Args:
+            path: File path (Fabric-style)
+
+        Yields:
+            str: Lines including their trailing newline
+
+        Raises:
+            FileNotFoundError: If file does not exist
+
+        Example:
+            for line in fs.iter_lines("Files/config/tables.jsonl"):
+                record = json.loads(line)
+        """
+        file_path = self._resolve_file(path)
+
+        with open(file_path, 'r', encoding='utf-8', buffering=1 << 20) as f:
+            yield from f
+
     def mkdirs(self, path: str) -> None:
         """
         Create directory and all parent directories.
@@ -303,6 +404,39 @@ class MockFileSystem:
             for f in files:
                 print(f"{f.name}: {f.size} bytes")
         """
+        return self._ls_one(path)
+
+    def ls_many(self, paths: List[str], max_workers: Optional[int] = None) -> Dict[str, List[FileInfo]]:
+        """
+        List several directories in parallel.
+
+        Not part of mssparkutils.fs; scandir/stat release the GIL, so listing
+        many table directories benefits from a thread pool.
+
+        Args:
+            paths: Directory paths (Fabric-style)
+            max_workers: Thread pool size (default: min(32, len(paths)))
+
+        Returns:
+            Dict[str, List[FileInfo]]: Listing per input path
+
+        Raises:
+            FileNotFoundError: If any path does not exist
+            NotADirectoryError: If any path is not a directory
+
+        Example:
+            listings = mssparkutils.fs.ls_many(["Files/a", "Files/b"])
+        """
+        unique_paths = list(dict.fromkeys(paths))
+        if not unique_paths:
+            return {}
+
+        workers = max_workers or min(32, len(unique_paths))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fs_ls") as executor:
+            return dict(zip(unique_paths, executor.map(self._ls_one, unique_paths)))
+
+    def _ls_one(self, path: str) -> List[FileInfo]:
+        """List a single directory (shared by ls and ls_many)."""
         dir_path = self._resolve_path(path)
 
         if not dir_path.exists():
@@ -312,21 +446,25 @@ class MockFileSystem:
             raise NotADirectoryError(f"Path is not a directory: {dir_path}")
 
         result = []
-        for item in dir_path.iterdir():
-            stat = item.stat()
-
-            # Convert modification time to milliseconds since epoch (Fabric format)
-            mod_time_ms = int(stat.st_mtime * 1000)
-
-            file_info = FileInfo(
-                name=item.name,
-                path=str(item),
-                size=stat.st_size if item.is_file() else 0,
-                modificationTime=mod_time_ms,
-                isDir=item.is_dir(),
-                isFile=item.is_file()
-            )
-            result.append(file_info)
+        # scandir levert het entry-type mee uit de directory read, zodat
+        # is_dir/is_file geen extra stat-call per entry kosten
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                stat = entry.stat()
+                is_file = entry.is_file()
+
+                # Convert modification time to milliseconds since epoch (Fabric format)
+                mod_time_ms = int(stat.st_mtime * 1000)
+
+                file_info = FileInfo(
+                    name=entry.name,
+                    path=entry.path,
+                    size=stat.st_size if is_file else 0,
+                    modificationTime=mod_time_ms,
+                    isDir=entry.is_dir(),
+                    isFile=is_file
+                )
+                result.append(file_info)
 
         logger.debug(f"fs.ls: Listed {len(result)} items in {dir_path}")
         return result
@@ -8,6 +8,7 @@ Key Features:
 - Runtime environment detection
 - Uniform Files-basepath detection (Fabric, cluster glob, local)
 - Parquet directory construction (Files/source/year/month/day/run_ts/table)
+- Single-LIST parquet file discovery per run (instead of a glob per table)
 - Files-path resolution to the correct physical root
 
 Author: Albert @ QBIDS
@@ -17,7 +18,7 @@ Date: 2025-11-25
 import glob
 import logging
 import os
-from typing import Optional
+from typing import Dict, Iterable, List, Optional
 from pyspark.sql import SparkSession
 
 from modules.constants import CLUSTER_FILES_ROOT
@@ -198,6 +199,127 @@ def build_parquet_dir(base_files: str,
     return resolve_files_path(relative_dir, spark)
 
 
+# Cache of non-empty list_run_files results, keyed by resolved run directory
+# (oldest entry evicted beyond RUN_FILES_CACHE_SIZE)
+_run_files_cache: Dict[str, Dict[str, List[str]]] = {}
+RUN_FILES_CACHE_SIZE = 8
+
+
+def build_run_dir(base_files: str,
+                  source_name: str,
+                  run_ts: str,
+                  spark: Optional[SparkSession] = None) -> str:
+    """
+    Build the directory path holding all table folders of a single run_ts.
+
+    Path structure: {base_files}/{source}/year/month/day/{run_ts}
+
+    Raises:
+        ValueError: If run_ts format is invalid (< 8 characters)
+    """
+    if not run_ts or len(run_ts) < 8:
+        raise ValueError(f"run_ts '{run_ts}' is not in expected yyyymmddThhmmss format")
+
+    relative_dir = f"Files/{base_files}/{source_name}/{run_ts[0:4]}/{run_ts[4:6]}/{run_ts[6:8]}/{run_ts}"
+    return resolve_files_path(relative_dir, spark)
+
+
+def _group_run_files(run_dir: str, file_paths: Iterable[str]) -> Dict[str, List[str]]:
+    """
+    Group listed file paths by table folder directly under run_dir.
+
+    Mirrors the `{table_dir}/*.parquet` glob: only parquet files that sit
+    directly in a table folder are kept, hidden/marker files are skipped.
+    """
+    prefix = run_dir.rstrip("/") + "/"
+    grouped: Dict[str, List[str]] = {}
+
+    for path in file_paths:
+        # Listed paths may be fully qualified (file:/..., abfss://...)
+        idx = path.find(prefix)
+        if idx < 0:
+            continue
+
+        parts = path[idx + len(prefix):].split("/")
+        if len(parts) != 2:
+            continue
+
+        table_name, file_name = parts
+        if not file_name.endswith(".parquet") or file_name.startswith(("_", ".")):
+            continue
+
+        grouped.setdefault(table_name, []).append(path)
+
+    for files in grouped.values():
+        files.sort()
+
+    return grouped
+
+
+def list_run_files(spark: SparkSession,
+                   base_files: str,
+                   source_name: str,
+                   run_ts: str,
+                   refresh: bool = False) -> Dict[str, List[str]]:
+    """
+    List all parquet files of a run with ONE recursive Hadoop FileSystem listing.
+
+    Replaces a driver-side glob expansion per table with a single listing per
+    run, which saves many storage LIST calls on OneLake/ADLS for large DAGs.
+    Non-empty results are cached per run directory (the last
+    RUN_FILES_CACHE_SIZE runs); a missing or empty run directory is listed
+    again on the next call, so a retry sees files that arrived since.
+    Callers that load a run should pass refresh=True.
+
+    Args:
+        spark: Active SparkSession (used for the Hadoop FileSystem)
+        base_files: Base folder name (e.g., 'greenhouse_sources')
+        source_name: Source system name (e.g., 'anva_concern')
+        run_ts: Run timestamp (e.g., '20251125T060000')
+        refresh: Ignore the cached listing and list again (default: False)
+
+    Returns:
+        Dict[str, List[str]]: table_name -> sorted parquet file paths.
+        Empty dict when the run directory does not exist.
+
+    Examples:
+        >>> run_files = list_run_files(spark, 'greenhouse_sources', 'anva_concern', '20251125T060000')
+        >>> run_files.get('Dim_Relatie', [])
+        ['.../20251125T060000/Dim_Relatie/part-00000.parquet', ...]
+    """
+    run_dir = build_run_dir(base_files, source_name, run_ts, spark)
+
+    if not refresh and run_dir in _run_files_cache:
+        return _run_files_cache[run_dir]
+
+    jvm = spark._jvm
+    hadoop_path = jvm.org.apache.hadoop.fs.Path(run_dir)
+    fs = hadoop_path.getFileSystem(spark._jsc.hadoopConfiguration())
+
+    if not fs.exists(hadoop_path):
+        logger.debug("Run directory %s does not exist", run_dir)
+        grouped: Dict[str, List[str]] = {}
+    else:
+        # Qualify run_dir the same way the listed paths are (scheme/authority)
+        qualified_dir = fs.makeQualified(hadoop_path).toString()
+        listed = []
+        iterator = fs.listFiles(hadoop_path, True)
+        while iterator.hasNext():
+            listed.append(iterator.next().getPath().toString())
+        grouped = _group_run_files(qualified_dir, listed)
+        logger.debug("Listed %d files for %d tables under %s", len(listed), len(grouped), run_dir)
+
+    if grouped:
+        _run_files_cache.pop(run_dir, None)
+        _run_files_cache[run_dir] = grouped
+        while len(_run_files_cache) > RUN_FILES_CACHE_SIZE:
+            _run_files_cache.pop(next(iter(_run_files_cache)))
+    else:
+        _run_files_cache.pop(run_dir, None)
+
+    return grouped
+
+
 # ============================================================================
 # FILES PATH RESOLUTION
 # ============================================================================
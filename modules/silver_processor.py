@@ -19,6 +19,7 @@ from uuid import uuid4
 import logging
 
 from modules.cdc_utils import reconstruct_bronze_current_state, get_business_columns
+from modules.delta_utils import invalidate_table_cache
 from modules.hash_utils import add_row_hash
 
 logger = logging.getLogger(__name__)
@@ -134,8 +135,17 @@ def process_silver_cdc_merge(
             if debug:
                 bronze_count = bronze_current.count()
                 logger.info(f"  Reconstructed Bronze state: {bronze_count:,} rows")
+        elif load_mode == "window":
+            # Window: a partitioned Bronze table keeps the months outside the
+            # window, so only the rows written by this run are current
+            bronze_current = spark.table(bronze_table_full) \
+                .where(F.col("_bronze_load_ts") == run_ts)
+
+            if debug:
+                bronze_count = bronze_current.count()
+                logger.info(f"  Bronze window: {bronze_count:,} rows")
         else:
-            # Snapshot/window: Bronze contains current state
+            # Snapshot: Bronze contains current state
             bronze_current = spark.table(bronze_table_full)
 
             if debug:
@@ -149,11 +159,14 @@ def process_silver_cdc_merge(
         # STEP 2: Add Row Hash
         # ====================================================================
 
+        # hash_algorithm is opt-in per table: existing Silver tables store a
+        # string sha256 row_hash, "xxhash64" stores a LongType hash
         bronze_with_hash = add_row_hash(
             bronze_current,
             hash_column="row_hash",
             include_cols=business_cols,
-            exclude_cols=None
+            exclude_cols=None,
+            hash_algorithm=table_def.get("hash_algorithm", "sha256")
         )
 
         if debug:
@@ -180,6 +193,7 @@ def process_silver_cdc_merge(
                 .format("delta") \
                 .mode("overwrite") \
                 .saveAsTable(silver_table_full)
+            invalidate_table_cache(silver_table_full)
 
             rows_inserted = bronze_with_hash.count()
 
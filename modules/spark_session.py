@@ -94,6 +94,11 @@ def get_or_create_spark_session(
     ###
     ## Additional builder configurations can be added here if needed
     ###
+
+    # FAIR scheduling lets concurrent per-table jobs (process_bronze_tables_batch)
+    # interleave instead of queueing FIFO
+    builder = builder.config("spark.scheduler.mode", "FAIR")
+
     try:
         import mssparkutils  # type: ignore
         
@@ -63,6 +63,11 @@ def _install_pyspark_stubs() -> None:
         "explode",
         "struct",
         "sum",
+        "xxhash64",
+        "count",
+        "first",
+        "length",
+        "broadcast",
         "input_file_name",
         "year",
         "month",
@@ -34,8 +34,12 @@ def _install_pyspark_stubs() -> None:
         def __init__(self, conf: Optional[SparkConf] = None):
             self.conf = conf or SparkConf()
 
+    class Row(tuple):  # pragma: no cover - structural stub
+        pass
+
     sql_module.SparkSession = SparkSession
     sql_module.SparkConf = SparkConf
+    sql_module.Row = Row
     sys.modules.setdefault("pyspark.sql", sql_module)
 
     functions_module = types.ModuleType("pyspark.sql.functions")
@@ -56,10 +60,16 @@ def _install_pyspark_stubs() -> None:
         "explode",
         "struct",
         "sum",
+        "xxhash64",
+        "count",
+        "first",
+        "length",
+        "broadcast",
     ]:
         setattr(functions_module, name, _not_implemented)
 
     sys.modules.setdefault("pyspark.sql.functions", functions_module)
+    sql_module.functions = sys.modules["pyspark.sql.functions"]
 
     dataframe_module = types.ModuleType("pyspark.sql.dataframe")
 
@@ -0,0 +1,132 @@
+import sys
+import types
+
+import pytest
+
+# bronze_processor imports DataFrameWriter and year/month, which the shared
+# pyspark stubs do not provide; patch them in only for this import
+with pytest.MonkeyPatch.context() as _mp:
+    _mp.setattr(sys.modules["pyspark.sql"], "DataFrameWriter", type("DataFrameWriter", (), {}), raising=False)
+    for _name in ("year", "month"):
+        _mp.setattr(sys.modules["pyspark.sql.functions"], _name, lambda *_: None, raising=False)
+    from modules import bronze_processor
+
+
+class FakeColumn:
+    def alias(self, _name):
+        return self
+
+
+class FakeWriter:
+    def __init__(self, df):
+        self.df = df
+        self.mode_name = None
+        self.options = {}
+
+    def format(self, _fmt):
+        return self
+
+    def mode(self, mode):
+        self.mode_name = mode
+        return self
+
+    def option(self, key, value):
+        self.options[key] = value
+        return self
+
+    def partitionBy(self, *_cols):
+        return self
+
+    def saveAsTable(self, name):
+        self.df.saves.append((self.mode_name, dict(self.options)))
+        error = self.df.errors.pop(0) if self.df.errors else None
+        if error:
+            raise error
+
+
+class FakeDataFrame:
+    def __init__(self, errors=None):
+        self.columns = ["id", "Boek_Datum"]
+        self.errors = list(errors or [])
+        self.saves = []
+
+    def select(self, *_cols):
+        return self
+
+    def hint(self, *_args):
+        return self
+
+    @property
+    def write(self):
+        return FakeWriter(self)
+
+
+@pytest.fixture
+def fake_bronze(monkeypatch):
+    for name in ("lit", "col", "year", "month"):
+        monkeypatch.setattr(bronze_processor, name, lambda *_: FakeColumn())
+    monkeypatch.setattr(bronze_processor, "build_parquet_dir", lambda *args: "Files/parquet")
+    monkeypatch.setattr(bronze_processor, "get_last_num_output_rows", lambda spark, table: 3)
+
+    def run(df, table_def):
+        spark = types.SimpleNamespace(read=types.SimpleNamespace(parquet=lambda *_: df))
+        return bronze_processor.process_bronze_table(
+            spark, table_def, "vizier", "run1", "20251105T142752505", "2025-11-05"
+        )
+
+    return run
+
+
+WINDOW_TABLE = {
+    "name": "boekingen",
+    "load_mode": "window",
+    "partitioning": {"type": "year_month"},
+}
+
+
+def test_partitioned_window_overwrites_only_loaded_partitions(fake_bronze):
+    df = FakeDataFrame()
+    result = fake_bronze(df, WINDOW_TABLE)
+
+    assert result["status"] == "SUCCESS"
+    assert df.saves == [("overwrite", {
+        "partitionOverwriteMode": "dynamic",
+        "maxRecordsPerFile": bronze_processor.BRONZE_MAX_RECORDS_PER_FILE,
+    })]
+
+
+def test_partitioned_window_schema_change_falls_back_to_full_overwrite(fake_bronze):
+    mismatch = Exception("A schema mismatch detected when writing to the Delta table")
+    df = FakeDataFrame(errors=[mismatch])
+    result = fake_bronze(df, WINDOW_TABLE)
+
+    assert result["status"] == "SUCCESS"
+    assert result["rows_processed"] == 3
+    assert len(df.saves) == 2
+    mode, options = df.saves[1]
+    assert mode == "overwrite"
+    assert options["overwriteSchema"] == "true"
+    assert "partitionOverwriteMode" not in options
+
+
+def test_partitioned_window_schema_fallback_failure_marks_failed(fake_bronze):
+    mismatch = Exception("A schema mismatch detected when writing to the Delta table")
+    df = FakeDataFrame(errors=[mismatch, Exception("disk full")])
+    result = fake_bronze(df, WINDOW_TABLE)
+
+    assert result["status"] == "FAILED"
+    assert "disk full" in result["error_message"]
+
+
+def test_incremental_zorder_optimizes_only_the_loaded_partition(fake_bronze, monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        bronze_processor, "optimize_table",
+        lambda spark, table, cols, where=None: calls.append((table, cols, where))
+    )
+    table_def = {"name": "mutaties", "load_mode": "incremental", "zorder_by": ["Id"]}
+
+    result = fake_bronze(FakeDataFrame(), table_def)
+
+    assert result["status"] == "SUCCESS"
+    assert calls == [("bronze.mutaties", ["Id"], "_bronze_load_ts = '20251105T142752505'")]
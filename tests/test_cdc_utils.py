@@ -0,0 +1,110 @@
+import sys
+import types
+
+import pytest
+
+# cdc_utils imports StorageLevel, which the shared pyspark stubs do not
+# provide; patch it in only for this import
+with pytest.MonkeyPatch.context() as _mp:
+    _mp.setattr(sys.modules["pyspark"], "StorageLevel", types.SimpleNamespace(), raising=False)
+    from modules import cdc_utils
+
+
+class FakeColumn:
+    """Column expression evaluated against a row dict."""
+
+    def __init__(self, fn, name=None):
+        self.fn = fn
+        self.name = name
+
+    def alias(self, name):
+        return FakeColumn(self.fn, name)
+
+    def isNotNull(self):
+        return FakeColumn(lambda row: self.fn(row) is not None)
+
+    def eqNullSafe(self, other):
+        return FakeColumn(lambda row: self.fn(row) == other.fn(row))
+
+    def otherwise(self, value):
+        return FakeColumn(lambda row: self.fn(row) if self.fn(row) is not None else value)
+
+    def __and__(self, other):
+        return FakeColumn(lambda row: self.fn(row) and other.fn(row))
+
+    def __invert__(self):
+        return FakeColumn(lambda row: not self.fn(row))
+
+
+class FakeDataFrame:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def select(self, *cols):
+        cols = [FakeColumn(lambda row, c=c: row.get(c), c) if isinstance(c, str) else c for c in cols]
+        return FakeDataFrame([{c.name: c.fn(row) for c in cols} for row in self.rows])
+
+    def where(self, predicate):
+        return FakeDataFrame([row for row in self.rows if predicate.fn(row)])
+
+    def join(self, other, keys, how):
+        assert how == "full_outer"
+        key = lambda row: tuple(row[k] for k in keys)
+        right = {key(row): row for row in other.rows}
+        empty_left = dict.fromkeys(self.rows[0]) if self.rows else {}
+        empty_right = dict.fromkeys(other.rows[0]) if other.rows else {}
+        joined = [{**empty_right, **row, **right.get(key(row), {})} for row in self.rows]
+        left_keys = {key(row) for row in self.rows}
+        joined += [{**empty_left, **row} for k, row in right.items() if k not in left_keys]
+        return FakeDataFrame(joined)
+
+    def agg(self, *cols):
+        return types.SimpleNamespace(first=lambda: {c.name: c.fn(self.rows) for c in cols})
+
+    def count(self):
+        return len(self.rows)
+
+
+@pytest.fixture
+def fake_functions(monkeypatch):
+    def when(condition, value):
+        return FakeColumn(lambda row: value if condition.fn(row) else None)
+
+    def spark_sum(column):
+        return FakeColumn(lambda rows: sum(column.fn(row) for row in rows))
+
+    monkeypatch.setattr(cdc_utils, "F", types.SimpleNamespace(
+        col=lambda name: FakeColumn(lambda row: row.get(name), name),
+        lit=lambda value: FakeColumn(lambda row: value),
+        when=when,
+        sum=spark_sum,
+    ))
+
+
+def test_cdc_statistics_match_compare_row_hashes_with_null_hashes(fake_functions):
+    bronze = FakeDataFrame([
+        {"id": 1, "row_hash": "a"},   # insert
+        {"id": 2, "row_hash": "b"},   # update
+        {"id": 3, "row_hash": None},  # unchanged (NULL on both sides)
+        {"id": 5, "row_hash": None},  # insert with NULL hash
+    ])
+    silver = FakeDataFrame([
+        {"id": 2, "row_hash": "x"},
+        {"id": 3, "row_hash": None},
+        {"id": 4, "row_hash": "d"},   # delete
+        {"id": 6, "row_hash": None},  # delete with NULL hash
+    ])
+
+    result = cdc_utils.compare_row_hashes(bronze, silver, ["id"])
+    stats = cdc_utils.get_cdc_statistics_from_df(result["joined"])
+
+    ids = lambda df: sorted(row["id"] for row in df.rows)
+    assert ids(result["inserts"]) == [1, 5]
+    assert ids(result["updates"]) == [2]
+    assert ids(result["unchanged"]) == [3]
+
+    assert stats["inserts"] == result["inserts"].count()
+    assert stats["updates"] == result["updates"].count()
+    assert stats["unchanged"] == result["unchanged"].count()
+    assert stats["deletes"] == 2
+    assert stats["total_rows"] == 6
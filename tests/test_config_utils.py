@@ -0,0 +1,46 @@
+import json
+import os
+import pytest
+from modules import config_utils
+
+
+@pytest.mark.unit
+def test_watermark_index_reuses_parse_until_file_changes(tmp_path, monkeypatch):
+    config_utils.clear_config_cache()
+    wm_path = tmp_path / "watermarks.json"
+    wm_path.write_text(json.dumps({"source": [{"name": "demo", "tables": {"t1": "2024-01-01"}}]}))
+
+    loads = []
+    real_loads = config_utils._json_loads
+    monkeypatch.setattr(config_utils, "_json_loads", lambda b: loads.append(b) or real_loads(b))
+
+    assert config_utils.get_table_watermark(str(wm_path), "demo", "t1") == "2024-01-01"
+    assert config_utils.get_table_watermark(str(wm_path), "demo", "t1") == "2024-01-01"
+    assert len(loads) == 1
+
+    wm_path.write_text(json.dumps({"source": [{"name": "demo", "tables": {"t1": "2024-02-01"}}]}))
+    stat = os.stat(wm_path)
+    os.utime(wm_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert config_utils.get_table_watermark(str(wm_path), "demo", "t1") == "2024-02-01"
+    assert len(loads) == 2
+
+
+@pytest.mark.unit
+def test_dag_index_tracks_enabled_tables_and_rebuilds_when_tables_change():
+    dag = {
+        "source": "demo",
+        "tables": [
+            {"name": "a", "load_mode": "incremental"},
+            {"name": "b", "enabled": "false"},
+            {"name": "c", "enabled": 1, "load_mode": "Snapshot"},
+        ],
+    }
+
+    assert [t["name"] for t in config_utils.get_enabled_tables(dag)] == ["a", "c"]
+    assert [t["name"] for t in config_utils.get_tables_to_process(dag, ["c", "b", "a", "x"])] == ["a", "c"]
+    assert [t["name"] for t in config_utils.get_tables_to_process(dag, ["b"], only_enabled=False)] == ["b"]
+    assert config_utils.summarize_dag(dag)["load_mode_counts"] == {"incremental": 1, "Snapshot": 1}
+
+    dag["tables"].append({"name": "d"})
+    assert [t["name"] for t in config_utils.get_enabled_tables(dag)] == ["a", "c", "d"]
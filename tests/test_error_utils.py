@@ -0,0 +1,124 @@
+import pytest
+
+from modules import error_utils
+
+
+SCHEMA_MISMATCH_MSG = "A schema mismatch detected when writing to the Delta table"
+
+
+def _raise_chained(outer, inner, suppress=False):
+    """Raise outer while handling inner (optionally ``from None``)."""
+    try:
+        try:
+            raise inner
+        except type(inner):
+            if suppress:
+                raise outer from None
+            raise outer
+    except type(outer) as e:
+        return e
+
+
+def test_classify_error_uses_exception_type():
+    assert error_utils.classify_error(FileNotFoundError("x")) == "MISSING_PATH"
+    assert error_utils.classify_error(ConnectionRefusedError("x")) == "CONNECTION"
+    assert error_utils.classify_error(TimeoutError("x")) == "TIMEOUT"
+
+
+def test_classify_error_outer_message_beats_chained_type():
+    for suppress in (False, True):
+        exc = _raise_chained(ValueError(SCHEMA_MISMATCH_MSG), FileNotFoundError("gone"), suppress)
+
+        assert error_utils.classify_error(exc) == "SCHEMA_MISMATCH"
+        assert error_utils.is_schema_mismatch_error(exc)
+
+
+def test_classify_error_ignores_suppressed_context():
+    exc = _raise_chained(ValueError("unexpected"), FileNotFoundError("gone"), suppress=True)
+
+    assert error_utils.classify_error(exc) == "UNKNOWN"
+
+
+def test_classify_error_walks_unsuppressed_context():
+    exc = _raise_chained(ValueError("unexpected"), FileNotFoundError("gone"))
+
+    assert error_utils.classify_error(exc) == "MISSING_PATH"
+
+
+def test_classify_error_follows_explicit_cause():
+    try:
+        try:
+            raise TimeoutError("slow")
+        except TimeoutError as inner:
+            raise RuntimeError("wrapped") from inner
+    except RuntimeError as e:
+        exc = e
+
+    assert error_utils.classify_error(exc) == "TIMEOUT"
+
+
+class SubstringAutomaton:
+    """Stand-in for pyahocorasick: yields (end_index, needle) per occurrence."""
+
+    def __init__(self):
+        self.needles = {n for _, rules in error_utils._CATEGORY_RULES for needles in rules for n in needles}
+
+    def iter(self, text):
+        for needle in self.needles:
+            start = text.find(needle)
+            while start >= 0:
+                yield start + len(needle) - 1, needle
+                start = text.find(needle, start + 1)
+
+
+MESSAGES = [
+    ("Path does not exist: Files/x/*.parquet", "MISSING_PATH"),
+    ("[Errno 2] No such file or directory", "MISSING_PATH"),
+    ("bronze.t is not a Delta table", "CORRUPT_DELTA"),
+    ("Protocol version 3 is UNSUPPORTED by this client", "CORRUPT_DELTA"),
+    ("Error reading the delta log", "CORRUPT_DELTA"),
+    ("protocol handshake", "UNKNOWN"),
+    ("unsupported operation", "UNKNOWN"),
+    ("Cannot resolve column 'x'", "SCHEMA_MISMATCH"),
+    ("Query timed out after 600s", "TIMEOUT"),
+    ("Connection refused by host", "CONNECTION"),
+    ("connection timeout", "TIMEOUT"),
+    ("path does not exist and schema mismatch", "MISSING_PATH"),
+    ("schema mismatch, connection refused", "SCHEMA_MISMATCH"),
+    ("incompatible format: cannot resolve column", "CORRUPT_DELTA"),
+    ("", "UNKNOWN"),
+    ("something else went wrong", "UNKNOWN"),
+]
+
+
+@pytest.mark.parametrize("message,expected", MESSAGES)
+def test_classify_error_priority_and_and_rules(message, expected, monkeypatch):
+    monkeypatch.setattr(error_utils, "_NEEDLE_AUTOMATON", None)
+
+    assert error_utils.classify_error(RuntimeError(message)) == expected
+
+
+def test_classify_error_automaton_matches_regex_path(monkeypatch):
+    monkeypatch.setattr(error_utils, "_NEEDLE_AUTOMATON", None)
+    regex_results = [error_utils._category_from_message(message) for message, _ in MESSAGES]
+
+    monkeypatch.setattr(error_utils, "_NEEDLE_AUTOMATON", SubstringAutomaton())
+    automaton_results = [error_utils._category_from_message(message) for message, _ in MESSAGES]
+
+    assert automaton_results == regex_results
+
+
+def test_real_automaton_matches_regex_path(monkeypatch):
+    pytest.importorskip("ahocorasick")
+    monkeypatch.setattr(error_utils, "_NEEDLE_AUTOMATON", error_utils._build_needle_automaton())
+
+    for message, expected in MESSAGES:
+        assert error_utils._classify_with_automaton(message) == expected, message
+
+
+def test_is_checks_match_classification_order():
+    exc = RuntimeError("path does not exist and schema mismatch")
+
+    assert error_utils.is_missing_path_error(exc)
+    assert error_utils.is_schema_mismatch_error(exc)
+    assert error_utils.classify_error(exc) == "MISSING_PATH"
@@ -9,6 +9,15 @@ class DummyDataFrame:
         self.columns = columns
         self.dtypes = dtypes or [(c, "string") for c in columns]
 
+    @property
+    def schema(self):
+        return {
+            name: types.SimpleNamespace(
+                dataType=types.SimpleNamespace(simpleString=lambda t=dtype: t)
+            )
+            for name, dtype in self.dtypes
+        }
+
 
 def test_add_row_hash_raises_when_column_exists():
     df = DummyDataFrame(["id", "row_hash"])
@@ -64,7 +73,125 @@ def fake_col(monkeypatch):
     return FakeColumn
 
 
+@pytest.fixture
+def fake_stats_functions(fake_col, monkeypatch):
+    alias = lambda value: types.SimpleNamespace(alias=lambda _: value)
+    monkeypatch.setattr(hash_utils, "lit", lambda value: value)
+    monkeypatch.setattr(hash_utils, "count", alias)
+    monkeypatch.setattr(hash_utils, "length", lambda value: value)
+    monkeypatch.setattr(hash_utils, "first", lambda value, ignorenulls: alias(value))
+
+
 def test_validate_hash_columns_checks_presence(fake_col):
     df = DummyDataFrame(["id"])
     with pytest.raises(ValueError):
-        hash_utils.validate_hash_columns(df)
\ No newline at end of file
+        hash_utils.validate_hash_columns(df)
+
+
+def test_validate_hash_columns_checks_nulls_and_length_in_one_job(fake_stats_functions):
+    class StatsDataFrame(DummyDataFrame):
+        agg_calls = 0
+
+        def __init__(self, stats):
+            super().__init__(["id", "row_hash"])
+            self.stats = stats
+
+        def agg(self, *_exprs):
+            StatsDataFrame.agg_calls += 1
+            return types.SimpleNamespace(collect=lambda: [self.stats])
+
+    assert hash_utils.validate_hash_columns(
+        StatsDataFrame({"null_count": 0, "row_count": 3, "hash_length": 64})
+    )
+    assert StatsDataFrame.agg_calls == 1
+
+    with pytest.raises(ValueError, match="Hash length 40"):
+        hash_utils.validate_hash_columns(
+            StatsDataFrame({"null_count": 0, "row_count": 3, "hash_length": 40})
+        )
+    with pytest.raises(ValueError, match="empty"):
+        hash_utils.validate_hash_columns(
+            StatsDataFrame({"null_count": None, "row_count": 0, "hash_length": None})
+        )
+
+
+def test_validate_hash_columns_sample_mode_limits_scan(fake_stats_functions):
+    limits = []
+
+    class LimitedDataFrame(DummyDataFrame):
+        def limit(self, rows):
+            limits.append(rows)
+            return self
+
+        def agg(self, *_exprs):
+            stats = {"null_count": 0, "row_count": 3, "hash_length": 64}
+            return types.SimpleNamespace(collect=lambda: [stats])
+
+    df = LimitedDataFrame(["id", "row_hash"])
+    assert hash_utils.validate_hash_columns(df, mode="sample")
+    assert hash_utils.validate_hash_columns(df, max_rows=10, mode="sample")
+    assert limits == [hash_utils.HASH_VALIDATION_SAMPLE_ROWS, 10]
+
+    with pytest.raises(ValueError, match="Unsupported mode"):
+        hash_utils.validate_hash_columns(df, mode="partial")
+
+
+def test_add_row_hash_xxhash64_hashes_sorted_typed_columns_and_null_flags(monkeypatch):
+    calls = {}
+
+    class HashableDataFrame(DummyDataFrame):
+        def withColumn(self, name, expr):
+            calls["column"] = name
+            calls["expr"] = expr
+            return self
+
+    class TypedColumn(str):
+        def cast(self, _type):
+            raise AssertionError("xxhash64 path must not cast to string")
+
+        def isNull(self):
+            return f"{self} IS NULL"
+
+    monkeypatch.setattr(hash_utils, "col", TypedColumn)
+    monkeypatch.setattr(hash_utils, "xxhash64", lambda *cols: ("xxhash64", cols))
+
+    df = HashableDataFrame(["b", "a"])
+    hash_utils.add_row_hash(df, hash_algorithm="xxhash64")
+
+    assert calls["column"] == "row_hash"
+    assert calls["expr"] == ("xxhash64", ("a", "b", "a IS NULL", "b IS NULL"))
+
+
+def test_add_row_hash_casts_only_non_string_columns(monkeypatch):
+    calls = {}
+
+    class HashableDataFrame(DummyDataFrame):
+        def withColumn(self, name, expr):
+            calls["expr"] = expr
+            return self
+
+    class TypedColumn(str):
+        def cast(self, _type):
+            return f"CAST({self})"
+
+    monkeypatch.setattr(hash_utils, "col", TypedColumn)
+    monkeypatch.setattr(hash_utils, "lit", lambda value: value)
+    monkeypatch.setattr(hash_utils, "coalesce", lambda *cols: cols)
+    monkeypatch.setattr(hash_utils, "concat_ws", lambda sep, *cols: cols)
+    monkeypatch.setattr(hash_utils, "sha2", lambda expr, _bits: expr)
+
+    df = HashableDataFrame(["name", "id"], dtypes=[("name", "string"), ("id", "int")])
+    hash_utils.add_row_hash(df)
+
+    assert calls["expr"] == (("CAST(id)", "∅"), ("name", "∅"))
+
+
+def test_add_row_hash_partitioned_skips_repartition_when_already_partitioned(monkeypatch):
+    class PartitionedDataFrame(DummyDataFrame):
+        def repartition(self, *_cols):
+            raise AssertionError("repartition must be skipped")
+
+    monkeypatch.setattr(hash_utils, "add_row_hash", lambda df, **_kwargs: df)
+
+    df = PartitionedDataFrame(["id", "name"])
+    assert hash_utils.add_row_hash_partitioned(df, ["id"], already_partitioned=True) is df
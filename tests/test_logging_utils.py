@@ -1,6 +1,9 @@
 import logging
+import logging.handlers
 import os
+import threading
 from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
 
@@ -11,18 +14,14 @@ from modules.constants import CLUSTER_FILES_ROOT
 @pytest.fixture(autouse=True)
 def reset_logging_state(monkeypatch):
     logging_utils._resolve_log_directory.cache_clear()
-    for attr in ["_configured", "_log_file"]:
-        if hasattr(logging_utils.configure_logging, attr):
-            delattr(logging_utils.configure_logging, attr)
+    logging_utils.reset_logging()
 
     root_logger = logging.getLogger()
     existing_handlers = list(root_logger.handlers)
     yield existing_handlers
 
     logging_utils._resolve_log_directory.cache_clear()
-    for attr in ["_configured", "_log_file"]:
-        if hasattr(logging_utils.configure_logging, attr):
-            delattr(logging_utils.configure_logging, attr)
+    logging_utils.reset_logging()
 
     for handler in [h for h in root_logger.handlers if h not in existing_handlers]:
         root_logger.removeHandler(handler)
@@ -100,4 +99,80 @@ def test_configure_logging_creates_file_under_resolved_directory(tmp_path, monke
     monkeypatch.setenv("NOTEBOOK_LOG_ROOT", str(tmp_path))
     log_file = logging_utils.configure_logging(run_name="sample")
     assert log_file.parent == tmp_path / "notebook_outputs" / "logs"
-    assert log_file.name.startswith("sample_")
\ No newline at end of file
+    assert log_file.name.startswith("sample_")
+
+
+def test_configure_logging_writes_file_through_background_listener(tmp_path, monkeypatch):
+    monkeypatch.setenv("NOTEBOOK_LOG_ROOT", str(tmp_path))
+    monkeypatch.setattr(logging_utils, "_start_periodic_flush", lambda interval: None)
+    log_file = logging_utils.configure_logging(run_name="buffered", enable_console_logging=False)
+
+    root_logger = logging.getLogger()
+    assert any(isinstance(h, logging.handlers.QueueHandler) for h in root_logger.handlers)
+    file_handler = logging_utils._find_file_handler(root_logger)
+    assert Path(file_handler.baseFilename) == log_file.resolve()
+
+    # Reconfiguring reuses the handler behind the listener
+    logging_utils.reset_logging()
+    logging_utils.configure_logging(run_name="buffered", enable_console_logging=False)
+    assert logging_utils._find_file_handler(root_logger) is file_handler
+
+    root_logger.error("written by the listener")
+    logging_utils._stop_queue_listener()
+    assert "written by the listener" in log_file.read_text(encoding="utf-8")
+    file_handler.close()
+
+
+def test_periodic_flush_thread_stops_on_reset():
+    logging_utils._start_periodic_flush(60.0)
+    stop = logging_utils._FLUSH_STOP
+    flusher = next(t for t in threading.enumerate() if t.name == "log-buffer-flush" and t.is_alive())
+
+    # A second start while one is running is a no-op
+    logging_utils._start_periodic_flush(60.0)
+    assert logging_utils._FLUSH_STOP is stop
+
+    logging_utils.reset_logging()
+    flusher.join(timeout=5)
+
+    assert stop.is_set()
+    assert not flusher.is_alive()
+    assert logging_utils._FLUSH_STOP is None
+
+
+class FakeHistory:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def select(self, *_cols):
+        return self
+
+    def collect(self):
+        return self.rows
+
+
+def test_maintain_log_tables_counts_files_since_last_optimize():
+    bronze, silver = logging_utils.BRONZE_LOG_TABLE, logging_utils.SILVER_LOG_TABLE
+    histories = {
+        # 3 appends since the last OPTIMIZE: below the threshold
+        bronze: [{"operation": "WRITE", "operationMetrics": {"numFiles": "1"}}] * 3
+        + [{"operation": "OPTIMIZE", "operationMetrics": {"numAddedFiles": "1"}}]
+        + [{"operation": "WRITE", "operationMetrics": {"numFiles": "50"}}],
+        # never optimized
+        silver: [{"operation": "WRITE", "operationMetrics": {"numFiles": "2"}}] * 3,
+    }
+    statements = []
+
+    def sql(statement):
+        statements.append(statement)
+        table = statement.split()[2]
+        return FakeHistory(histories.get(table, []))
+
+    optimized = logging_utils.maintain_log_tables(SimpleNamespace(sql=sql), min_files=5)
+
+    assert optimized[bronze] is False
+    assert optimized[silver] is True
+    assert [s for s in statements if s.startswith("OPTIMIZE")] == [
+        f"OPTIMIZE {silver} ZORDER BY (run_ts, table_name)"
+    ]
+    assert all("LIMIT 5" in s for s in statements if s.startswith("DESCRIBE HISTORY"))
@@ -56,4 +56,72 @@ def test_run_writes_into_output_directory(dummy_notebook, tmp_path, monkeypatch)
 
     result = json.loads(result_json)
     assert created_outputs.exists()
-    assert Path(result["output_notebook"]).parent == created_outputs.resolve()
\ No newline at end of file
+    assert Path(result["output_notebook"]).parent == created_outputs.resolve()
+
+def test_mock_fs_round_trips_bytes_and_text(tmp_path):
+    fs = notebook_utils.MockFileSystem()
+    path = str(tmp_path / "config" / "blob.bin")
+    payload = b'{"k": "\xc3\xa9"}\x00\xff'
+
+    fs.put(path, payload)
+    assert fs.read(path, binary=True) == payload
+
+    with pytest.raises(FileExistsError):
+        fs.put(path, "text")
+
+    fs.put(path, "héllo", overwrite=True)
+    assert fs.read(path) == "héllo"
+    assert fs.read(path, binary=True) == "héllo".encode("utf-8")
+
+
+def test_mock_fs_iter_lines_streams_lines_with_newlines(tmp_path):
+    fs = notebook_utils.MockFileSystem()
+    path = tmp_path / "tables.jsonl"
+    path.write_text('{"a": 1}\n{"b": 2}\nlast', encoding="utf-8")
+
+    assert list(fs.iter_lines(str(path))) == ['{"a": 1}\n', '{"b": 2}\n', "last"]
+
+    with pytest.raises(FileNotFoundError):
+        list(fs.iter_lines(str(tmp_path / "missing.jsonl")))
+    with pytest.raises(IsADirectoryError):
+        list(fs.iter_lines(str(tmp_path)))
+
+
+def test_mock_fs_ls_reports_flags_and_sizes(tmp_path):
+    fs = notebook_utils.MockFileSystem()
+    (tmp_path / "data.parquet").write_bytes(b"x" * 10)
+    (tmp_path / "sub").mkdir()
+
+    entries = {info.name: info for info in fs.ls(str(tmp_path))}
+
+    assert set(entries) == {"data.parquet", "sub"}
+    data, sub = entries["data.parquet"], entries["sub"]
+    assert (data.isFile, data.isDir, data.size) == (True, False, 10)
+    assert (sub.isFile, sub.isDir, sub.size) == (False, True, 0)
+    assert data.path == str(tmp_path / "data.parquet")
+    assert data.modificationTime == int((tmp_path / "data.parquet").stat().st_mtime * 1000)
+
+    with pytest.raises(NotADirectoryError):
+        fs.ls(str(tmp_path / "data.parquet"))
+
+
+def test_mock_fs_ls_many_dedupes_paths_and_propagates_errors(tmp_path, monkeypatch):
+    fs = notebook_utils.MockFileSystem()
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / f"{name}.parquet").write_bytes(b"1")
+    a, b = str(tmp_path / "a"), str(tmp_path / "b")
+
+    listed = []
+    real_ls_one = fs._ls_one
+    monkeypatch.setattr(fs, "_ls_one", lambda path: listed.append(path) or real_ls_one(path))
+
+    listings = fs.ls_many([a, b, a])
+
+    assert list(listings) == [a, b]
+    assert sorted(listed) == [a, b]
+    assert [info.name for info in listings[b]] == ["b.parquet"]
+    assert fs.ls_many([]) == {}
+
+    with pytest.raises(FileNotFoundError):
+        fs.ls_many([a, str(tmp_path / "missing")])
@@ -1,4 +1,5 @@
 import os
+from types import SimpleNamespace
 import pytest
 from modules import path_utils
 
@@ -110,4 +111,85 @@ def test_build_parquet_dir_validates_run_ts():
             source_name="anva_concern",
             run_ts="2025",
             table_name="Dim_Relatie",
-        )
\ No newline at end of file
+        )
+
+
+@pytest.mark.unit
+def test_group_run_files_mirrors_table_glob():
+    run_dir = "file:/data/Files/greenhouse_sources/demo/2024/01/01/20240101T000000"
+    listed = [
+        f"{run_dir}/demo_table/part-00001.parquet",
+        f"{run_dir}/demo_table/part-00000.parquet",
+        f"{run_dir}/demo_table/_SUCCESS",
+        f"{run_dir}/demo_table/nested/part-00000.parquet",
+        f"{run_dir}/other_table/part-00000.parquet",
+        f"{run_dir}/loose_file.parquet",
+    ]
+
+    grouped = path_utils._group_run_files(run_dir, listed)
+
+    assert grouped == {
+        "demo_table": [
+            f"{run_dir}/demo_table/part-00000.parquet",
+            f"{run_dir}/demo_table/part-00001.parquet",
+        ],
+        "other_table": [f"{run_dir}/other_table/part-00000.parquet"],
+    }
+
+
+@pytest.mark.unit
+def test_list_run_files_does_not_cache_missing_run_dir(monkeypatch):
+    run_dir = "file:/data/Files/greenhouse_sources/demo/2024/01/01/20240101T000000"
+    state = {"exists": False, "lists": 0}
+
+    class FakePath(str):
+        def toString(self):
+            return str(self)
+
+        def getFileSystem(self, _conf):
+            return FakeFileSystem()
+
+    class FakeStatus:
+        def __init__(self, path):
+            self.path = FakePath(path)
+
+        def getPath(self):
+            return self.path
+
+    class FakeIterator:
+        def __init__(self, paths):
+            self.paths = list(paths)
+
+        def hasNext(self):
+            return bool(self.paths)
+
+        def next(self):
+            return FakeStatus(self.paths.pop(0))
+
+    class FakeFileSystem:
+        def exists(self, _path):
+            return state["exists"]
+
+        def makeQualified(self, _path):
+            return FakePath(run_dir)
+
+        def listFiles(self, _path, _recursive):
+            state["lists"] += 1
+            return FakeIterator([f"{run_dir}/demo_table/part-00000.parquet"])
+
+    hadoop_fs = SimpleNamespace(Path=FakePath)
+    spark = SimpleNamespace(
+        _jvm=SimpleNamespace(org=SimpleNamespace(apache=SimpleNamespace(hadoop=SimpleNamespace(fs=hadoop_fs)))),
+        _jsc=SimpleNamespace(hadoopConfiguration=lambda: None),
+    )
+    monkeypatch.setattr(path_utils, "build_run_dir", lambda *args: run_dir)
+    monkeypatch.setattr(path_utils, "_run_files_cache", {})
+
+    assert path_utils.list_run_files(spark, "greenhouse_sources", "demo", "20240101T000000") == {}
+
+    # Files arrived after the first attempt: a retry must list again
+    state["exists"] = True
+    expected = {"demo_table": [f"{run_dir}/demo_table/part-00000.parquet"]}
+    assert path_utils.list_run_files(spark, "greenhouse_sources", "demo", "20240101T000000") == expected
+    assert path_utils.list_run_files(spark, "greenhouse_sources", "demo", "20240101T000000") == expected
+    assert state["lists"] == 1